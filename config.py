@@ -10,6 +10,21 @@ DATA_DIR = os.path.join(BASE_DIR, 'data')
 if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR)
 
+# Thư mục dữ liệu dạng cột (Parquet, chia phân vùng theo mùa giải)
+PARQUET_DIR = os.path.join(DATA_DIR, 'parquet')
+
+# Kho dữ liệu SQLite (bảng trận đấu, đội hình, cầu thủ có chỉ mục)
+WAREHOUSE_PATH = os.path.join(DATA_DIR, 'warehouse.sqlite')
+
+# Kho đặc trưng huấn luyện đã tính (cache theo từng trận đấu)
+FEATURE_STORE_DIR = os.path.join(DATA_DIR, 'feature_store')
+
+# Cache kết quả đánh giá từng fold khi tinh chỉnh tham số mô hình
+SEARCH_CACHE_PATH = os.path.join(DATA_DIR, 'cache', 'search_cache.sqlite')
+
+# Thư mục lưu mô hình, scaler và metadata do pipeline.py huấn luyện
+MODEL_DIR = os.path.join(DATA_DIR, 'models')
+
 # Cấu hình API
 API_BASE_URL = 'https://footballapi.pulselive.com/football'
 
@@ -32,13 +47,81 @@ SEASONS = {
     '2017-2018': '79',
 }
 
+# Ngày thi đấu đầu tiên và cuối cùng của từng mùa giải (theo danh sách trận đấu của API),
+# dùng để suy ra mùa giải từ thời điểm bắt đầu trận đấu (mùa 2019-2020 kết thúc tháng 7/2020)
+SEASON_DATES = {
+    '2024-2025': ('2024-08-16', '2025-05-25'),
+    '2023-2024': ('2023-08-11', '2024-05-19'),
+    '2022-2023': ('2022-08-05', '2023-05-28'),
+    '2021-2022': ('2021-08-13', '2022-05-22'),
+    '2020-2021': ('2020-09-12', '2021-05-23'),
+    '2019-2020': ('2019-08-09', '2020-07-26'),
+    '2018-2019': ('2018-08-10', '2019-05-12'),
+    '2017-2018': ('2017-08-11', '2018-05-13'),
+}
+
+# Mùa giải đang diễn ra (dữ liệu còn thay đổi, cần làm mới định kỳ)
+CURRENT_SEASON = '2024-2025'
+
 # Cấu hình logging
 LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 LOG_FILE = os.path.join(BASE_DIR, 'scraper.log')
 
-# Cấu hình delay
-MIN_DELAY = 1
-MAX_DELAY = 3
+# Cấu hình thu thập song song
+MATCH_WORKERS = 8           # Số trận đấu được thu thập đồng thời (1 = tuần tự)
+PLAYER_WORKERS = 8          # Số cầu thủ được thu thập đồng thời (1 = tuần tự)
+SEASON_JOBS = 4             # Số lượt (loại dữ liệu + mùa giải) của main.py chạy đồng thời
+
+# Cấu hình giới hạn tốc độ (token bucket dùng chung cho mọi request)
+RATE_LIMIT_PER_SECOND = 5        # Số request/giây tối đa
+RATE_LIMIT_BURST = 10            # Số request có thể gửi dồn cùng lúc
+RATE_LIMIT_MIN_PER_SECOND = 0.5  # Tốc độ thấp nhất khi API báo quá tải
+RATE_LIMIT_BACKOFF_FACTOR = 0.5  # Hệ số giảm tốc khi gặp 429/503
+RATE_LIMIT_RECOVERY_STEP = 0.05  # Mức tăng tốc độ sau mỗi request thành công
+
+# Cấu hình đọc danh sách phân trang (danh sách trận đấu, cầu thủ của mùa giải)
+LISTING_PAGE_SIZE = 100         # Số bản ghi mỗi trang
+LISTING_PAGE_CONCURRENCY = 4    # Số trang được tải đồng thời
+
+# Cấu hình HTTP client bất đồng bộ
+MAX_IN_FLIGHT_REQUESTS = 16  # Số request tối đa đang chờ phản hồi cùng lúc
+HTTP_KEEPALIVE_TIMEOUT = 30  # Thời gian giữ kết nối keep-alive (giây)
+
+# Cấu hình thử lại request lỗi (timeout, mất kết nối, 429/5xx)
+HTTP_REQUEST_TIMEOUT = 30        # Thời gian tối đa của một request (giây)
+HTTP_CONNECT_TIMEOUT = 10        # Thời gian tối đa để mở kết nối (giây)
+HTTP_MAX_RETRIES = 5             # Số lần gửi lại tối đa một request
+RETRY_BACKOFF_BASE = 1.0         # Thời gian chờ cơ sở giữa các lần thử lại (giây), nhân đôi mỗi lần
+RETRY_BACKOFF_MAX = 60           # Thời gian chờ tối đa giữa các lần thử lại (giây)
+RETRY_STATUSES = (429, 500, 502, 503, 504)  # Mã trạng thái được gửi lại
+
+# Cấu hình circuit breaker (tạm dừng thu thập khi API liên tục lỗi)
+CIRCUIT_BREAKER_THRESHOLD = 10       # Số request lỗi liên tiếp để tạm dừng
+CIRCUIT_BREAKER_COOLDOWN = 30        # Thời gian tạm dừng (giây), nhân đôi nếu API vẫn lỗi
+CIRCUIT_BREAKER_MAX_COOLDOWN = 300   # Thời gian tạm dừng tối đa (giây)
+
+# Cấu hình cache phản hồi API trên đĩa
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_OFFLINE = False   # True = chỉ đọc từ cache, không gửi request
+HTTP_CACHE_PATH = os.path.join(DATA_DIR, 'cache', 'http_cache.sqlite')
+# Thời gian sống (giây) theo loại endpoint cho mùa giải hiện tại;
+# dữ liệu các mùa đã kết thúc được giữ vĩnh viễn
+HTTP_CACHE_TTL = {
+    'fixtures': 6 * 3600,            # Danh sách trận đấu
+    'fixture': 3600,                 # Chi tiết trận đấu
+    'match_stats': 3600,             # Thống kê trận đấu
+    'players': 24 * 3600,            # Danh sách cầu thủ
+    'player': 24 * 3600,             # Thông tin chung cầu thủ
+    'player_stats': 6 * 3600,        # Thống kê mùa giải của cầu thủ
+    'player_match_stats': 6 * 3600,  # Thống kê từng trận của cầu thủ
+}
+HTTP_CACHE_DEFAULT_TTL = 3600
+
+# Thư mục lưu checkpoint để chạy tiếp (--resume) khi thu thập bị gián đoạn
+CHECKPOINT_DIR = os.path.join(DATA_DIR, 'checkpoints')
+
+# Thư mục lưu manifest trạng thái trận đấu cho chế độ cập nhật tăng dần (--incremental)
+MANIFEST_DIR = os.path.join(DATA_DIR, 'manifests')
 
 # Hàm tạo đường dẫn output
 def get_output_path(data_type, season, file_format='json'):
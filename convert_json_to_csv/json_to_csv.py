@@ -1,18 +1,38 @@
-import json
+import argparse
 import csv
+import json
+import os
+import sys
 import traceback
 
-def extract_player_names(player_list):
-    """Chuyển danh sách cầu thủ thành danh sách tên (hiển thị)"""
+# Thêm thư mục gốc vào path để import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.json_stream import iter_json_records
+
+def extract_lineup_players(player_list):
+    """Chuyển danh sách cầu thủ trong đội hình thành danh sách (tên, player_id, vị trí, số áo)"""
     if not player_list:
         return []
-    return [p.get("name", {}).get("display", "") for p in player_list]
+    players = []
+    for p in player_list:
+        info = p.get("info") or {}
+        players.append({
+            "name": p.get("name", {}).get("display", ""),
+            "player_id": p.get("id"),
+            "position": p.get("matchPosition") or info.get("position"),
+            "shirt_num": p.get("matchShirtNumber") or info.get("shirtNum"),
+        })
+    return players
 
-def parse_match_data(match, index=None):
-    """Phân tích dữ liệu trận đấu, với xử lý lỗi cẩn thận"""
+def parse_match_data(match, index=None, quiet=False):
+    """Phân tích dữ liệu trận đấu, với xử lý lỗi cẩn thận
+
+    quiet=True: không in cảnh báo (dùng khi quét trước để xác định danh sách cột)
+    """
     try:
         if not match:
-            print(f"⚠️ Bỏ qua trận đấu thứ {index}: Dữ liệu trận đấu trống")
+            if not quiet:
+                print(f"⚠️ Bỏ qua trận đấu thứ {index}: Dữ liệu trận đấu trống")
             return None
             
         # ==== A. Thông tin cơ bản ====
@@ -21,6 +41,7 @@ def parse_match_data(match, index=None):
         
         row = {
             "match_id": match.get("id"),
+            "season": match.get("season"),
             "match_date": match.get("kick_off", {}).get("label") if match.get("kick_off") else None,
             "kickoff_millis": match.get("kick_off", {}).get("millis") if match.get("kick_off") else None,
             "stadium": match.get("ground", {}).get("name") if match.get("ground") else None,
@@ -33,7 +54,8 @@ def parse_match_data(match, index=None):
         # ==== B. Thông tin 2 đội ====
         teams = match.get("teams", [])
         if len(teams) != 2:
-            print(f"⚠️ Bỏ qua trận đấu thứ {index}: Không đủ 2 đội (chỉ có {len(teams)} đội)")
+            if not quiet:
+                print(f"⚠️ Bỏ qua trận đấu thứ {index}: Không đủ 2 đội (chỉ có {len(teams)} đội)")
             return None  # Bỏ qua nếu dữ liệu không đủ 2 đội
 
         home_team = teams[0] if teams and len(teams) > 0 else {}
@@ -41,7 +63,8 @@ def parse_match_data(match, index=None):
         
         # Kiểm tra xem home_team và away_team có phải là dict không
         if not isinstance(home_team, dict) or not isinstance(away_team, dict):
-            print(f"⚠️ Bỏ qua trận đấu thứ {index}: Dữ liệu đội không hợp lệ")
+            if not quiet:
+                print(f"⚠️ Bỏ qua trận đấu thứ {index}: Dữ liệu đội không hợp lệ")
             return None
             
         # Kiểm tra cẩn thận các trường dữ liệu đội
@@ -62,14 +85,16 @@ def parse_match_data(match, index=None):
         away_id = row.get("away_team_id")
         
         if not home_id or not away_id:
-            print(f"⚠️ Trận đấu thứ {index}: Thiếu ID đội nhà hoặc đội khách, bỏ qua thống kê chi tiết")
+            if not quiet:
+                print(f"⚠️ Trận đấu thứ {index}: Thiếu ID đội nhà hoặc đội khách, bỏ qua thống kê chi tiết")
             return row  # Vẫn trả về thông tin cơ bản nếu không có ID đội
 
         # ==== C. Lấy thống kê ====
         stats = match.get("stats", {})
         if not stats:
             # Trận đấu không có thống kê, vẫn tiếp tục với các thông tin khác
-            print(f"⚠️ Trận đấu thứ {index}: Không có thống kê")
+            if not quiet:
+                print(f"⚠️ Trận đấu thứ {index}: Không có thống kê")
         
         # Xử lý an toàn hơn với các trường hợp có thể None
         home_stats_obj = stats.get(str(home_id), {}) if stats and home_id else {}
@@ -112,73 +137,124 @@ def parse_match_data(match, index=None):
                     away_list = team_list
                     break
 
-        home_starting = extract_player_names(home_list.get("lineup", [])) if home_list else []
-        home_subs = extract_player_names(home_list.get("substitutes", [])) if home_list else []
-        away_starting = extract_player_names(away_list.get("lineup", [])) if away_list else []
-        away_subs = extract_player_names(away_list.get("substitutes", [])) if away_list else []
-
-        for i in range(11):
-            row[f"home_starting_{i+1}_name"] = home_starting[i] if i < len(home_starting) else ""
-            row[f"away_starting_{i+1}_name"] = away_starting[i] if i < len(away_starting) else ""
+        # Lấy cả player_id, vị trí và số áo bên cạnh tên để không phải ghép theo tên về sau
+        lineups = {
+            "home_starting": extract_lineup_players(home_list.get("lineup", [])) if home_list else [],
+            "home_sub": extract_lineup_players(home_list.get("substitutes", [])) if home_list else [],
+            "away_starting": extract_lineup_players(away_list.get("lineup", [])) if away_list else [],
+            "away_sub": extract_lineup_players(away_list.get("substitutes", [])) if away_list else [],
+        }
 
-        for i in range(9):
-            row[f"home_sub_{i+1}_name"] = home_subs[i] if i < len(home_subs) else ""
-            row[f"away_sub_{i+1}_name"] = away_subs[i] if i < len(away_subs) else ""
+        for prefix, players in lineups.items():
+            slots = 11 if prefix.endswith("starting") else 9
+            for i in range(slots):
+                player = players[i] if i < len(players) else {}
+                row[f"{prefix}_{i+1}_name"] = player.get("name", "")
+                row[f"{prefix}_{i+1}_player_id"] = player.get("player_id")
+                row[f"{prefix}_{i+1}_position"] = player.get("position")
+                row[f"{prefix}_{i+1}_shirt_num"] = player.get("shirt_num")
 
         return row
         
     except Exception as e:
-        print(f"❌ Lỗi xử lý trận đấu thứ {index}: {str(e)}")
-        traceback.print_exc()
+        if not quiet:
+            print(f"❌ Lỗi xử lý trận đấu thứ {index}: {str(e)}")
+            traceback.print_exc()
         return None
 
-# ==== MAIN ====
-# Thêm xử lý lỗi khi mở file và đọc json
-try:
-    input_path = "data/matches_2024-2025_20250518_071839.json"     # <== Thay bằng đường dẫn file của bạn
-    output_path = "data/all_matches_2024_2025.csv"
-
-    print(f"Đang đọc dữ liệu từ file: {input_path}")
-    with open(input_path, "r", encoding="utf-8") as f:
-        matches = json.load(f)
-
-    print(f"Đã đọc {len(matches)} trận đấu, đang xử lý...")
-    rows = []
-    for i, match in enumerate(matches):
-        try:
-            row = parse_match_data(match, i)
-            if row:
-                rows.append(row)
-        except Exception as e:
-            print(f"❌ Lỗi khi xử lý trận đấu thứ {i}: {str(e)}")
-            
-    print(f"Đã xử lý thành công {len(rows)}/{len(matches)} trận đấu")
+def iter_match_rows(input_paths, quiet=False):
+    """Đọc lần lượt các trận đấu từ các file JSON/JSONL và trả về từng dòng CSV
 
-    if not rows:
-        print("❌ Không có dữ liệu trận đấu nào để ghi vào file CSV")
-        exit(1)
+    Mỗi trận đấu được đọc, xử lý rồi bỏ đi ngay nên bộ nhớ không phụ thuộc vào số trận đấu.
+    """
+    index = 0
+    for input_path in input_paths:
+        for match in iter_json_records(input_path):
+            row = parse_match_data(match, index, quiet=quiet)
+            index += 1
+            if row:
+                yield row
 
-    # Lấy toàn bộ tên cột
+def scan_fieldnames(input_paths):
+    """Quét trước các file đầu vào để lấy toàn bộ tên cột (chỉ giữ tập tên cột trong bộ nhớ)"""
     all_keys = set()
-    for row in rows:
+    for row in iter_match_rows(input_paths, quiet=True):
         all_keys.update(row.keys())
-    fieldnames = sorted(all_keys)
+    return sorted(all_keys)
+
+def load_schema(schema_path):
+    """Đọc danh sách cột từ dòng tiêu đề của một file CSV có sẵn"""
+    with open(schema_path, "r", newline='', encoding="utf-8") as f:
+        return next(csv.reader(f))
+
+def convert_matches(input_paths, output_path, fieldnames=None):
+    """Chuyển các file trận đấu JSON/JSONL thành một file CSV, ghi từng dòng ngay khi xử lý xong
+
+    Args:
+        input_paths (list): Các file JSON (mảng) hoặc JSONL đầu vào, ví dụ nhiều mùa giải
+        output_path (str): File CSV đầu ra
+        fieldnames (list): Danh sách cột đã biết; nếu None sẽ quét trước các file đầu vào
 
+    Returns:
+        int: Số trận đấu đã ghi
+    """
+    if fieldnames is None:
+        print("Đang quét dữ liệu để xác định danh sách cột...")
+        fieldnames = scan_fieldnames(input_paths)
+    print(f"Sử dụng {len(fieldnames)} cột")
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    count = 0
+    known = set(fieldnames)
+    unknown_columns = set()
     print(f"Đang ghi dữ liệu vào file CSV: {output_path}")
     with open(output_path, "w", newline='', encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
         writer.writeheader()
-        writer.writerows(rows)
-
-    print("✅ Đã tạo file CSV:", output_path)
-    
-except FileNotFoundError:
-    print(f"❌ Lỗi: Không tìm thấy file {input_path}")
-    print("Hãy kiểm tra lại đường dẫn file JSON đầu vào.")
-    
-except json.JSONDecodeError:
-    print(f"❌ Lỗi: File JSON không hợp lệ, không thể đọc dữ liệu từ {input_path}")
-    
-except Exception as e:
-    print(f"❌ Lỗi không xác định: {str(e)}")
-    traceback.print_exc()
+        for row in iter_match_rows(input_paths):
+            unknown_columns.update(key for key in row if key not in known)
+            writer.writerow(row)
+            count += 1
+
+    if unknown_columns:
+        print(f"⚠️ Bỏ qua {len(unknown_columns)} cột không có trong schema: {', '.join(sorted(unknown_columns))}")
+    return count
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Chuyển dữ liệu trận đấu JSON/JSONL sang CSV')
+    parser.add_argument('inputs', nargs='+',
+                        help='Các file trận đấu JSON (mảng) hoặc JSONL, có thể gồm nhiều mùa giải')
+    parser.add_argument('-o', '--output', required=True, help='File CSV đầu ra')
+    parser.add_argument('--schema',
+                        help='File CSV có sẵn dùng làm danh sách cột (bỏ qua bước quét trước)')
+    return parser.parse_args()
+
+# ==== MAIN ====
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        fieldnames = load_schema(args.schema) if args.schema else None
+        count = convert_matches(args.inputs, args.output, fieldnames)
+
+        if not count:
+            print("❌ Không có dữ liệu trận đấu nào để ghi vào file CSV")
+            sys.exit(1)
+
+        print(f"✅ Đã ghi {count} trận đấu vào file CSV: {args.output}")
+
+    except FileNotFoundError as e:
+        print(f"❌ Lỗi: Không tìm thấy file {e.filename or e}")
+        print("Hãy kiểm tra lại đường dẫn file đầu vào.")
+        sys.exit(1)
+
+    except json.JSONDecodeError:
+        print("❌ Lỗi: File JSON không hợp lệ, không thể đọc dữ liệu")
+        sys.exit(1)
+
+    except Exception as e:
+        print(f"❌ Lỗi không xác định: {str(e)}")
+        traceback.print_exc()
+        sys.exit(1)
@@ -1,43 +1,145 @@
-import json
+import argparse
 import csv
+import glob
 import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
 
-def convert_json_to_csv(json_file_path, output_csv_path):
-    with open(json_file_path, 'r', encoding='utf-8') as f:
-        players = json.load(f)
-
-    processed_players = []
-    all_keys = set()
-
-    for player in players:
-        processed = {}
-        for k, v in player.items():
-            # Loại bỏ tiền tố 'stat_' nếu có
-            clean_key = k[5:] if k.startswith("stat_") else k
-            processed[clean_key] = v
-            all_keys.add(clean_key)
-        processed_players.append(processed)
-
-    # Ưu tiên thứ tự cột cơ bản
-    preferred_order = [
-        'player_id', 'name', 'first_name', 'last_name', 'season', 'position',
-        'shirt_num', 'nationality', 'age', 'team_name', 'team_short_name',
-        'mins_played', 'goals', 'assists', 'clean_sheets'
-    ]
-    all_keys = list(sorted(all_keys - set(preferred_order)))
-    fieldnames = preferred_order + all_keys
+# Thêm thư mục gốc vào path để import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.json_stream import iter_json_records
 
+# Ưu tiên thứ tự cột cơ bản
+PREFERRED_ORDER = [
+    'player_id', 'name', 'first_name', 'last_name', 'season', 'position',
+    'shirt_num', 'nationality', 'age', 'team_name', 'team_short_name',
+    'mins_played', 'goals', 'assists', 'clean_sheets'
+]
+
+# Mẫu tên file JSON cầu thủ do EnhancedPlayerSpider tạo ra
+PLAYER_JSON_PATTERN = 'players_enhanced_*.json'
+DEFAULT_OUTPUT_DIR = os.path.join('data', 'data_csv', 'player')
+
+
+def clean_player(player):
+    """Loại bỏ tiền tố 'stat_' khỏi tên cột của một cầu thủ"""
+    return {(k[5:] if k.startswith("stat_") else k): v for k, v in player.items()}
+
+
+def scan_player_keys(json_file_path):
+    """Đọc lần lượt các cầu thủ trong file và trả về tập tên cột (đã bỏ tiền tố 'stat_')"""
+    keys = set()
+    for player in iter_json_records(json_file_path):
+        keys.update(clean_player(player).keys())
+    return keys
+
+
+def build_fieldnames(key_sets):
+    """Thứ tự cột chung: PREFERRED_ORDER rồi đến hợp các cột thống kê (sắp xếp theo tên)"""
+    all_keys = set().union(*key_sets)
+    return PREFERRED_ORDER + sorted(all_keys - set(PREFERRED_ORDER))
+
+
+def convert_json_to_csv(json_file_path, output_csv_path, fieldnames=None):
+    """Chuyển một file JSON cầu thủ sang CSV, ghi từng cầu thủ ngay khi đọc
+
+    Args:
+        json_file_path (str): File JSON (mảng) hoặc JSONL đầu vào
+        output_csv_path (str): File CSV đầu ra
+        fieldnames (list): Thứ tự cột dùng chung; nếu None sẽ quét trước chính file đầu vào
+
+    Returns:
+        int: Số cầu thủ đã ghi
+    """
+    if fieldnames is None:
+        fieldnames = build_fieldnames([scan_player_keys(json_file_path)])
+
+    output_dir = os.path.dirname(output_csv_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    count = 0
     with open(output_csv_path, 'w', newline='', encoding='utf-8') as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
-        for player in processed_players:
-            writer.writerow(player)
+        for player in iter_json_records(json_file_path):
+            writer.writerow(clean_player(player))
+            count += 1
+
+    print(f"✅ Đã tạo file CSV: {output_csv_path} ({count} cầu thủ)")
+    return count
+
+
+def output_path_for(json_file_path, output_dir):
+    """players_enhanced_2021_2022_<timestamp>.json -> <output_dir>/players_2021_2022.csv"""
+    name = os.path.basename(json_file_path)
+    match = re.search(r'(\d{4}_\d{4})', name)
+    if match:
+        return os.path.join(output_dir, f"players_{match.group(1)}.csv")
+    return os.path.join(output_dir, os.path.splitext(name)[0] + '.csv')
+
+
+def _convert_job(job):
+    return convert_json_to_csv(*job)
+
+
+def convert_directory(input_dir, output_dir=DEFAULT_OUTPUT_DIR, pattern=PLAYER_JSON_PATTERN, workers=None):
+    """Chuyển song song tất cả file JSON cầu thủ trong thư mục sang CSV
+
+    Bước 1 quét song song tên cột của mọi file để lấy thứ tự cột chung, bước 2
+    ghi song song từng file CSV với cùng thứ tự cột đó, nên các mùa giải có cùng
+    tiêu đề và có thể gộp trực tiếp.
+
+    Returns:
+        dict: Đường dẫn CSV -> số cầu thủ đã ghi
+    """
+    json_files = sorted(glob.glob(os.path.join(input_dir, pattern)))
+    if not json_files:
+        print(f"⚠️ Không tìm thấy file {pattern} trong {input_dir}")
+        return {}
+
+    # Nếu một mùa có nhiều file (nhiều lần thu thập), dùng file mới nhất (tên có timestamp lớn nhất)
+    jobs = {}
+    for json_file in json_files:
+        output_csv = output_path_for(json_file, output_dir)
+        if output_csv in jobs:
+            print(f"⚠️ Bỏ qua {jobs[output_csv]}, dùng file mới hơn {json_file}")
+        jobs[output_csv] = json_file
+
+    print(f"Đang quét {len(jobs)} file để xác định danh sách cột...")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        key_sets = list(executor.map(scan_player_keys, jobs.values()))
+        fieldnames = build_fieldnames(key_sets)
+        print(f"Sử dụng {len(fieldnames)} cột chung cho tất cả file")
+
+        job_args = [(json_file, output_csv, fieldnames) for output_csv, json_file in jobs.items()]
+        counts = list(executor.map(_convert_job, job_args))
+
+    return dict(zip(jobs.keys(), counts))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Chuyển dữ liệu cầu thủ JSON sang CSV')
+    parser.add_argument('input',
+                        help=f'File JSON cầu thủ hoặc thư mục chứa các file {PLAYER_JSON_PATTERN}')
+    parser.add_argument('-o', '--output',
+                        help='File CSV đầu ra (khi input là file) hoặc thư mục đầu ra '
+                             f'(khi input là thư mục, mặc định: {DEFAULT_OUTPUT_DIR})')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Số tiến trình song song (mặc định: số CPU)')
+    return parser.parse_args()
 
-    print(f"✅ Đã tạo file CSV: {output_csv_path}")
 
 # ==== CÁCH DÙNG ====
-# Bạn thay đường dẫn tương ứng nếu muốn xử lý file khác
-convert_json_to_csv(
-    json_file_path='data\players_enhanced_2021_2022_20250518_122704.json',
-    output_csv_path='data/players_2021_2022.csv'
-)
+# python convert_json_to_csv/player_json_to_csv.py data/data_json/player/
+# python convert_json_to_csv/player_json_to_csv.py data/data_json/player/players_enhanced_2021_2022_20250518_122704.json -o data/players_2021_2022.csv
+if __name__ == "__main__":
+    args = parse_args()
+
+    if os.path.isdir(args.input):
+        results = convert_directory(args.input, args.output or DEFAULT_OUTPUT_DIR, workers=args.workers)
+        print(f"✅ Đã chuyển {len(results)} file, tổng {sum(results.values())} cầu thủ")
+    else:
+        output_csv = args.output or output_path_for(args.input, DEFAULT_OUTPUT_DIR)
+        convert_json_to_csv(args.input, output_csv)
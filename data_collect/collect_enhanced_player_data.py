@@ -7,10 +7,13 @@ import logging
 import argparse
 from datetime import datetime
 
-# Thêm thư mục scrapers vào path để import
-sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scrapers'))
+# Thêm thư mục gốc và thư mục scrapers vào path để import
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+sys.path.append(os.path.join(ROOT_DIR, 'scrapers'))
 from enhanced_player_spider import EnhancedPlayerSpider
-from config import LOG_FORMAT, SEASONS
+from utils.http_client import ApiClient
+from config import LOG_FORMAT, SEASONS, PLAYER_WORKERS
 
 # Cấu hình logging cho file này
 logging.basicConfig(
@@ -32,6 +35,18 @@ def main():
                         help='Số lượng cầu thủ tối đa cần thu thập (mặc định: tất cả)')
     parser.add_argument('--player-id', type=int, default=None,
                         help='ID của cầu thủ cụ thể cần thu thập (không cần nếu thu thập toàn bộ mùa)')
+    parser.add_argument('--workers', type=int, default=PLAYER_WORKERS,
+                        help=f'Số cầu thủ được thu thập song song, 1 = tuần tự (mặc định: {PLAYER_WORKERS})')
+    parser.add_argument('--from-listing', action='store_true',
+                        help='Lấy thông tin chung từ danh sách cầu thủ của mùa giải, chỉ gọi API chi tiết khi danh sách thiếu trường')
+    parser.add_argument('--stream', action='store_true',
+                        help='Ghi từng cầu thủ vào file JSONL ngay khi thu thập xong (bộ nhớ không tăng theo số cầu thủ)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Tiếp tục lần thu thập trước, bỏ qua các cầu thủ đã có trong checkpoint')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Không dùng cache phản hồi API trên đĩa')
+    parser.add_argument('--offline', action='store_true',
+                        help='Chỉ đọc dữ liệu từ cache, không gửi request tới API')
     
     args = parser.parse_args()
     season = args.season
@@ -49,14 +64,16 @@ def main():
     logger.info(f"Thời gian bắt đầu: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
     # Khởi tạo spider
-    spider = EnhancedPlayerSpider()
+    client = ApiClient(max_in_flight=args.workers * 3, rotate_user_agent=True,
+                       use_cache=not args.no_cache, offline=args.offline)
+    spider = EnhancedPlayerSpider(workers=args.workers, client=client, use_listing=args.from_listing)
     
     # Thu thập dữ liệu
     if player_id:
         # Thu thập dữ liệu cho một cầu thủ cụ thể
         logger.info(f"Đang thu thập dữ liệu cho cầu thủ ID: {player_id}")
         player_data = {"id": player_id, "name": {"display": f"Player {player_id}"}}
-        player_info = spider.scrape_player(player_data, season, season_id)
+        player_info = spider.scrape_single_player(player_data, season, season_id)
         
         if player_info:
             data = [player_info]
@@ -64,11 +81,18 @@ def main():
         else:
             data = []
             logger.warning(f"Không thể thu thập dữ liệu cho cầu thủ ID: {player_id}")
+    elif args.stream:
+        # Thu thập toàn bộ mùa giải, ghi luồng JSONL thay vì giữ dữ liệu trong bộ nhớ
+        logger.info(f"Đang thu thập dữ liệu cho tất cả cầu thủ trong mùa giải {season} (ghi luồng JSONL)")
+        jsonl_path = spider.scrape_season_jsonl(season, max_players, resume=args.resume)
+        if jsonl_path:
+            logger.info(f"Đã lưu dữ liệu dạng JSONL: {jsonl_path}")
+        data = []
     else:
         # Thu thập dữ liệu cho toàn bộ mùa giải
         max_msg = f" (giới hạn {max_players} cầu thủ)" if max_players else ""
         logger.info(f"Đang thu thập dữ liệu cho tất cả cầu thủ trong mùa giải {season}{max_msg}")
-        data = spider.scrape_season(season, max_players)
+        data = spider.scrape_season(season, max_players, resume=args.resume)
     
     # Lưu dữ liệu
     if data:
@@ -86,7 +110,7 @@ def main():
             logger.info(f"Đã lưu dữ liệu chi tiết trận đấu dạng CSV: {match_csv_path}")
         
         logger.info(f"Tổng số cầu thủ đã thu thập: {len(data)}")
-    else:
+    elif not args.stream:
         logger.warning(f"Không thu thập được dữ liệu cầu thủ nào cho mùa {season}")
     
     logger.info(f"===== KẾT THÚC THU THẬP DỮ LIỆU NÂNG CAO CHO CẦU THỦ MÙA {season} =====")
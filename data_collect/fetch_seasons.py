@@ -1,18 +1,18 @@
 import json
 import logging
-import requests
-import time
-import random
 import sys
 import os
 from datetime import datetime
 
 # Thêm thư mục gốc vào path để import config
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import (
-    API_BASE_URL, API_HEADERS, SEASONS, MIN_DELAY, MAX_DELAY, DATA_DIR,
+    API_BASE_URL, SEASONS, DATA_DIR,
     get_output_path
 )
+from utils.http_client import ApiClient
+from utils.retry import RequestFailedError
+from utils.pagination import iter_listing
 
 # Cấu hình logging
 logging.basicConfig(
@@ -26,78 +26,67 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class SeasonFetcher:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(API_HEADERS)
+    def __init__(self, client: ApiClient = None):
+        self.client = client or ApiClient()
 
-    def get_season_matches(self, season_id: str):
+    async def get_season_matches(self, season_id: str):
         """Lấy danh sách ID trận đấu của một mùa giải"""
-        url = f"{API_BASE_URL}/fixtures?comps=1&compSeasons={season_id}&page=0&pageSize=2000"
+        url = f"{API_BASE_URL}/fixtures?comps=1&compSeasons={season_id}"
         
         try:
-            # Thêm delay ngẫu nhiên
-            time.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
-            
             logger.info(f"Đang gửi request đến: {url}")
-            response = self.session.get(url)
-            response.raise_for_status()
-            
-            logger.info(f"Đã nhận phản hồi thành công (status code: {response.status_code})")
-            data = response.json()
             match_ids = []
             
-            for match in data.get("content", []):
+            # Đọc theo từng trang (song song), không giới hạn số trận đấu
+            async for match in iter_listing(self.client, url):
                 match_ids.append(int(match.get("id")))
             
+            logger.info("Đã nhận phản hồi thành công")
+            
             logger.info(f"Tìm thấy {len(match_ids)} trận đấu cho mùa giải {season_id}")
             return match_ids
         
         except Exception as e:
+            # Không trả danh sách rỗng/thiếu: để bên gọi báo lỗi cả mùa giải
             logger.error(f"Lỗi khi lấy danh sách trận đấu: {str(e)}")
-            return []
+            raise
 
-    def get_match_data(self, match_id: int):
+    async def get_match_data(self, match_id: int, season: str = None):
         """Lấy thông tin chi tiết về trận đấu"""
         url = f"{API_BASE_URL}/fixtures/{match_id}?altIds=true"
         
         try:
-            # Thêm delay ngẫu nhiên
-            time.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
-            
             logger.info(f"Đang lấy dữ liệu trận đấu {match_id}")
-            response = self.session.get(url)
-            response.raise_for_status()
-            
-            return response.json()
+            return await self.client.get_json(url, season=season)
         
+        except RequestFailedError:
+            # Lỗi tạm thời vẫn còn sau khi thử lại: không coi là "không có dữ liệu"
+            raise
         except Exception as e:
             logger.error(f"Lỗi khi lấy thông tin trận đấu {match_id}: {str(e)}")
             return None
 
-    def get_match_stats(self, match_id: int):
+    async def get_match_stats(self, match_id: int, season: str = None):
         """Lấy thống kê của trận đấu"""
         url = f"{API_BASE_URL}/stats/match/{match_id}"
         
         try:
-            # Thêm delay ngẫu nhiên
-            time.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
-            
-            response = self.session.get(url)
-            response.raise_for_status()
-            
-            return response.json()
+            return await self.client.get_json(url, season=season)
         
+        except RequestFailedError:
+            # Lỗi tạm thời vẫn còn sau khi thử lại: không coi là "không có dữ liệu"
+            raise
         except Exception as e:
             logger.error(f"Lỗi khi lấy thống kê trận đấu {match_id}: {str(e)}")
             return None
 
-    def scrape_match(self, match_id: int, season: str):
+    async def scrape_match(self, match_id: int, season: str):
         """Thu thập dữ liệu cho một trận đấu"""
-        match_data = self.get_match_data(match_id)
+        match_data = await self.get_match_data(match_id, season)
         if not match_data:
             return None
         
-        stats_data = self.get_match_stats(match_id)
+        stats_data = await self.get_match_stats(match_id, season)
         
         # Kết hợp dữ liệu
         combined_data = {
@@ -124,7 +113,7 @@ class SeasonFetcher:
         
         return combined_data
 
-    def scrape_season(self, season: str):
+    async def scrape_season_async(self, season: str):
         """Thu thập dữ liệu cho một mùa giải"""
         season_id = SEASONS.get(season)
         if not season_id:
@@ -132,7 +121,7 @@ class SeasonFetcher:
             return []
         
         logger.info(f"Bắt đầu thu thập dữ liệu mùa giải {season} (ID: {season_id})")
-        match_ids = self.get_season_matches(season_id)
+        match_ids = await self.get_season_matches(season_id)
         
         if not match_ids:
             logger.error(f"Không tìm thấy trận đấu nào cho mùa giải {season}")
@@ -140,17 +129,29 @@ class SeasonFetcher:
         
         logger.info(f"Chuẩn bị thu thập dữ liệu cho {len(match_ids)} trận đấu")
         matches_data = []
+        failed = []
         
         for idx, match_id in enumerate(match_ids):
             logger.info(f"Đang thu thập dữ liệu trận đấu {match_id} ({idx+1}/{len(match_ids)})")
-            match_data = self.scrape_match(match_id, season)
+            try:
+                match_data = await self.scrape_match(match_id, season)
+            except RequestFailedError as e:
+                logger.error(f"Bỏ qua trận đấu {match_id}: {str(e)}")
+                failed.append(match_id)
+                continue
             
             if match_data:
                 matches_data.append(match_data)
         
         logger.info(f"Đã thu thập dữ liệu {len(matches_data)}/{len(match_ids)} trận đấu cho mùa giải {season}")
+        if failed:
+            logger.warning(f"{len(failed)} trận đấu bị lỗi sau khi đã thử lại: {failed[:20]}")
         return matches_data
 
+    def scrape_season(self, season: str):
+        """Thu thập dữ liệu cho một mùa giải"""
+        return self.client.run(self.scrape_season_async(season))
+
     def save_data_json(self, data, season: str):
         """Lưu dữ liệu vào file JSON"""
         if not data:
@@ -172,7 +173,12 @@ def fetch_multiple_seasons(seasons):
     
     for season in seasons:
         logger.info(f"===== Bắt đầu thu thập dữ liệu mùa giải {season} =====")
-        data = fetcher.scrape_season(season)
+        try:
+            data = fetcher.scrape_season(season)
+        except Exception as e:
+            # Không lấy được danh sách trận đấu: báo lỗi riêng mùa này, các mùa khác vẫn chạy
+            logger.error(f"Lỗi khi lấy danh sách trận đấu mùa giải {season}: {str(e)}")
+            data = None
         
         if data:
             json_path = fetcher.save_data_json(data, season)
@@ -0,0 +1,55 @@
+import argparse
+import glob
+import logging
+import os
+import sys
+
+# Thêm thư mục gốc vào path để import
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from config import LOG_FORMAT, WAREHOUSE_PATH
+from utils.warehouse import Warehouse
+
+logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+
+
+def collect_input_files(inputs):
+    """Danh sách file JSON/JSONL từ các file hoặc thư mục đầu vào"""
+    files = []
+    for path in inputs:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, '*.json')) + glob.glob(os.path.join(path, '*.jsonl'))))
+        else:
+            files.append(path)
+    return files
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Nạp dữ liệu spider (JSON/JSONL) vào kho dữ liệu SQLite')
+    parser.add_argument('inputs', nargs='+',
+                        help='Các file hoặc thư mục chứa file trận đấu/cầu thủ JSON hoặc JSONL')
+    parser.add_argument('--db', default=WAREHOUSE_PATH,
+                        help=f'Đường dẫn file SQLite (mặc định: {WAREHOUSE_PATH})')
+    return parser.parse_args()
+
+
+# ==== CÁCH DÙNG ====
+# python load_warehouse.py data/data_json/player/ data/matches_2023-2024_20250518_071839.json
+if __name__ == "__main__":
+    args = parse_args()
+    files = collect_input_files(args.inputs)
+    if not files:
+        print("❌ Không tìm thấy file JSON/JSONL nào để nạp")
+        sys.exit(1)
+
+    total_matches = total_players = 0
+    with Warehouse(args.db) as warehouse:
+        for path in files:
+            try:
+                matches, players = warehouse.load_file(path)
+            except Exception as e:
+                print(f"⚠️ Lỗi khi nạp file {path}: {str(e)}")
+                continue
+            total_matches += matches
+            total_players += players
+
+    print(f"✅ Đã nạp {total_matches} trận đấu và {total_players} cầu thủ vào {args.db}")
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import argparse
+import asyncio
 import logging
 import os
 import sys
@@ -11,7 +12,10 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from scrapers.match_spider import MatchSpider
 from scrapers.player_spider import PlayerSpider
-from config import LOG_FORMAT, LOG_FILE, SEASONS
+from utils.http_client import ApiClient
+from utils.progress import CrawlProgress
+from utils.warehouse import Warehouse
+from config import LOG_FORMAT, LOG_FILE, SEASONS, MATCH_WORKERS, SEASON_JOBS, MAX_IN_FLIGHT_REQUESTS
 
 # Cấu hình logging
 logging.basicConfig(
@@ -33,11 +37,111 @@ def parse_args():
                         help='Mùa giải cần thu thập (mặc định: 2023-2024)')
     parser.add_argument('--all-seasons', action='store_true',
                         help='Thu thập dữ liệu cho tất cả các mùa giải')
-    parser.add_argument('--format', choices=['json', 'csv', 'both'], default='both',
-                        help='Định dạng file output (mặc định: both - cả JSON và CSV)')
+    parser.add_argument('--format', choices=['json', 'csv', 'both', 'jsonl', 'parquet', 'sqlite'], default='both',
+                        help='Định dạng file output (mặc định: both - cả JSON và CSV; '
+                             'jsonl - ghi luồng từng bản ghi ngay khi thu thập xong; '
+                             'parquet - dataset dạng cột chia theo mùa giải; '
+                             'sqlite - nạp vào kho dữ liệu SQLite có chỉ mục)')
+    parser.add_argument('--workers', type=int, default=MATCH_WORKERS,
+                        help=f'Số luồng thu thập trận đấu song song, 1 = tuần tự (mặc định: {MATCH_WORKERS})')
+    parser.add_argument('--jobs', type=int, default=SEASON_JOBS,
+                        help=f'Số lượt (loại dữ liệu + mùa giải) chạy đồng thời, dùng chung giới hạn tốc độ, '
+                             f'1 = lần lượt từng mùa (mặc định: {SEASON_JOBS})')
+    parser.add_argument('--resume', action='store_true',
+                        help='Tiếp tục lần thu thập trước, bỏ qua các trận đấu/cầu thủ đã có trong checkpoint')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Chỉ thu thập lại các trận đấu mới hoặc đã thay đổi kể từ lần chạy trước')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Không dùng cache phản hồi API trên đĩa')
+    parser.add_argument('--offline', action='store_true',
+                        help='Chỉ đọc dữ liệu từ cache, không gửi request tới API')
     
     return parser.parse_args()
 
+def save_matches(match_spider: MatchSpider, matches_data, season: str, output_format: str) -> None:
+    """Lưu dữ liệu trận đấu một mùa giải theo định dạng đã chọn"""
+    if output_format in ['json', 'both']:
+        match_spider.save_data_json(matches_data, season)
+        logger.info(f"Đã lưu dữ liệu JSON trận đấu mùa {season}")
+    
+    if output_format in ['csv', 'both']:
+        match_spider.save_data_csv(matches_data, season)
+        logger.info(f"Đã lưu dữ liệu CSV trận đấu mùa {season}")
+    
+    if output_format == 'parquet':
+        match_spider.save_data_parquet(matches_data, season)
+        logger.info(f"Đã lưu dữ liệu Parquet trận đấu mùa {season}")
+    
+    if output_format == 'sqlite':
+        with Warehouse() as warehouse:
+            count = warehouse.load_matches(matches_data)
+        logger.info(f"Đã nạp {count} trận đấu mùa {season} vào {warehouse.path}")
+
+def save_players(player_spider: PlayerSpider, players_data, season: str, output_format: str) -> None:
+    """Lưu dữ liệu cầu thủ một mùa giải theo định dạng đã chọn"""
+    if output_format in ['json', 'both']:
+        player_spider.save_data_json(players_data, season)
+        logger.info(f"Đã lưu dữ liệu JSON cầu thủ mùa {season}")
+    
+    if output_format in ['csv', 'both']:
+        player_spider.save_data_csv(players_data, season)
+        logger.info(f"Đã lưu dữ liệu CSV cầu thủ mùa {season}")
+    
+    if output_format == 'parquet':
+        player_spider.save_data_parquet(players_data, season)
+        logger.info(f"Đã lưu dữ liệu Parquet cầu thủ mùa {season}")
+    
+    if output_format == 'sqlite':
+        with Warehouse() as warehouse:
+            count = warehouse.load_players(players_data)
+        logger.info(f"Đã nạp {count} cầu thủ mùa {season} vào {warehouse.path}")
+
+async def run_unit(kind: str, season: str, match_spider: MatchSpider, player_spider: PlayerSpider, args) -> None:
+    """Thu thập và lưu một lượt (loại dữ liệu + mùa giải)"""
+    # Các bước lưu file chạy đồng bộ trong vòng lặp sự kiện, nên các lượt không ghi
+    # vào cùng kho SQLite/dataset Parquet cùng lúc
+    if kind == 'match':
+        if args.format == 'jsonl':
+            await match_spider.stream_season_jsonl(season, resume=args.resume, incremental=args.incremental)
+            return
+        matches_data = await match_spider.scrape_season_async(season, resume=args.resume, incremental=args.incremental)
+        save_matches(match_spider, matches_data, season, args.format)
+    else:
+        if args.format == 'jsonl':
+            await player_spider.stream_season_jsonl(season, resume=args.resume)
+            return
+        players_data = await player_spider.scrape_season_async(season, resume=args.resume)
+        save_players(player_spider, players_data, season, args.format)
+
+async def run_jobs(units, match_spider: MatchSpider, player_spider: PlayerSpider,
+                   progress: CrawlProgress, jobs: int, args):
+    """Chạy các lượt thu thập, tối đa `jobs` lượt cùng lúc
+
+    Mọi lượt dùng chung một ApiClient (giới hạn tốc độ, số request đang chờ, cache),
+    nên chạy nhiều lượt song song tận dụng hết tốc độ cho phép thay vì chờ lần lượt
+    từng mùa. Một lượt lỗi không làm dừng các lượt khác.
+
+    Returns:
+        List: Các lượt (loại dữ liệu, mùa giải) bị lỗi
+    """
+    semaphore = asyncio.Semaphore(max(1, jobs))
+    failed = []
+    
+    async def run(unit):
+        kind, season = unit
+        async with semaphore:
+            logger.info(f"Đang thu thập dữ liệu {'trận đấu' if kind == 'match' else 'cầu thủ'} mùa {season}")
+            try:
+                await run_unit(kind, season, match_spider, player_spider, args)
+            except Exception as e:
+                logger.error(f"Lỗi khi thu thập {kind} mùa {season}: {str(e)}")
+                failed.append(unit)
+            finally:
+                progress.unit_finished()
+    
+    await asyncio.gather(*(run(unit) for unit in units))
+    return failed
+
 def main():
     """Hàm chính để chạy thu thập dữ liệu"""
     args = parse_args()
@@ -45,35 +149,27 @@ def main():
     # Xác định danh sách mùa giải cần thu thập
     seasons = list(SEASONS.keys()) if args.all_seasons else [args.season]
     
-    if args.type in ['match', 'all']:
-        match_spider = MatchSpider()
-        for season in seasons:
-            logger.info(f"Đang thu thập dữ liệu trận đấu mùa {season}")
-            matches_data = match_spider.scrape_season(season)
-            
-            if args.format in ['json', 'both']:
-                json_path = match_spider.save_data_json(matches_data, season)
-                logger.info(f"Đã lưu dữ liệu JSON trận đấu mùa {season}")
-            
-            if args.format in ['csv', 'both']:
-                csv_path = match_spider.save_data_csv(matches_data, season)
-                logger.info(f"Đã lưu dữ liệu CSV trận đấu mùa {season}")
+    # Mỗi cặp (loại dữ liệu, mùa giải) là một lượt thu thập
+    kinds = ['match', 'player'] if args.type == 'all' else [args.type]
+    units = [(kind, season) for kind in kinds for season in seasons]
+    
+    # Client HTTP dùng chung cho mọi spider
+    client = ApiClient(
+        max_in_flight=max(MAX_IN_FLIGHT_REQUESTS, args.workers * 2),
+        use_cache=not args.no_cache,
+        offline=args.offline
+    )
+    progress = CrawlProgress(units=len(units))
+    match_spider = MatchSpider(workers=args.workers, client=client, progress=progress)
+    player_spider = PlayerSpider(client=client, progress=progress)
     
-    if args.type in ['player', 'all']:
-        player_spider = PlayerSpider()
-        for season in seasons:
-            logger.info(f"Đang thu thập dữ liệu cầu thủ mùa {season}")
-            players_data = player_spider.scrape_season(season)
-            
-            if args.format in ['json', 'both']:
-                json_path = player_spider.save_data_json(players_data, season)
-                logger.info(f"Đã lưu dữ liệu JSON cầu thủ mùa {season}")
-            
-            if args.format in ['csv', 'both']:
-                csv_path = player_spider.save_data_csv(players_data, season)
-                logger.info(f"Đã lưu dữ liệu CSV cầu thủ mùa {season}")
+    jobs = min(max(1, args.jobs), len(units))
+    logger.info(f"Thu thập {len(units)} lượt (loại dữ liệu + mùa giải), {jobs} lượt chạy đồng thời")
+    failed = client.run(run_jobs(units, match_spider, player_spider, progress, jobs, args))
     
+    if failed:
+        logger.warning(f"{len(failed)}/{len(units)} lượt bị lỗi: {failed}")
     logger.info("Thu thập dữ liệu hoàn tất!")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
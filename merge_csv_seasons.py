@@ -1,7 +1,9 @@
-import pandas as pd
 import os
 import sys
 
+from utils.csv_merge import merge_csv_streaming
+from utils.parquet_io import csv_to_parquet
+
 def merge_specific_files(file1, file2, output_file):
     """
     Ghép 2 file CSV cụ thể theo chiều dọc, với file1 nằm trên đầu
@@ -21,39 +23,35 @@ def merge_specific_files(file1, file2, output_file):
         return False
     
     print(f"Đang ghép nối 2 file CSV:")
+    print(f"1. File: {os.path.basename(file1)}")
+    print(f"2. File: {os.path.basename(file2)}")
     
-    # Đọc file 1 (mùa 2024-2025)
-    try:
-        print(f"1. Đọc file: {os.path.basename(file1)}")
-        df1 = pd.read_csv(file1)
-        print(f"   - Số dòng: {len(df1):,}")
-    except Exception as e:
-        print(f"❌ Lỗi khi đọc file {os.path.basename(file1)}: {str(e)}")
-        return False
-    
-    # Đọc file 2 (các mùa khác)
-    try:
-        print(f"2. Đọc file: {os.path.basename(file2)}")
-        df2 = pd.read_csv(file2)
-        print(f"   - Số dòng: {len(df2):,}")
-    except Exception as e:
-        print(f"❌ Lỗi khi đọc file {os.path.basename(file2)}: {str(e)}")
-        return False
-    
-    # Ghép các DataFrame
+    # Ghép theo luồng: chỉ đọc tiêu đề để hợp các cột, sau đó sao chép từng khối dòng
     print("\nĐang ghép nối 2 file...")
+    parquet_output = output_file.endswith('.parquet')
+    csv_output = output_file + '.csv' if parquet_output else output_file
     try:
-        # Sử dụng ignore_index=True để đánh số lại các dòng
-        combined_df = pd.concat([df1, df2], ignore_index=True)
+        # strict: file lỗi làm dừng cả lần ghép, file kết quả cũ được giữ nguyên
+        counts = merge_csv_streaming([file1, file2], csv_output, strict=True)
+        if len(counts) < 2:
+            if os.path.exists(csv_output):
+                os.remove(csv_output)
+            print("❌ Lỗi khi đọc file CSV đầu vào")
+            return False
         
-        # Lưu kết quả
-        combined_df.to_csv(output_file, index=False)
+        # File .parquet được ghi dạng cột, có kiểu dữ liệu
+        if parquet_output:
+            # Chuyển theo từng khối (không nạp lại toàn bộ file CSV vào bộ nhớ)
+            try:
+                csv_to_parquet(csv_output, output_file)
+            finally:
+                os.remove(csv_output)
         
+        rows1, rows2 = counts[file1], counts[file2]
         print(f"\n✅ Đã ghép nối thành công 2 file CSV và lưu vào {output_file}")
-        print(f"   - Số dòng file 1: {len(df1):,}")
-        print(f"   - Số dòng file 2: {len(df2):,}")
-        print(f"   - Tổng số dòng: {len(df1) + len(df2):,}")
-        print(f"   - Số dòng sau khi ghép: {len(combined_df):,}")
+        print(f"   - Số dòng file 1: {rows1:,}")
+        print(f"   - Số dòng file 2: {rows2:,}")
+        print(f"   - Tổng số dòng: {rows1 + rows2:,}")
         
         return True
     except Exception as e:
@@ -1,8 +1,9 @@
 import os
-import csv
-import pandas as pd
 from datetime import datetime
 
+from utils.csv_merge import merge_csv_streaming
+from utils.parquet_io import csv_to_parquet
+
 def merge_csv_files(input_files, output_file):
     """
     Gộp nhiều file CSV theo chiều dọc (vertical concatenation)
@@ -19,40 +20,30 @@ def merge_csv_files(input_files, output_file):
     
     print(f"Bắt đầu gộp {len(input_files)} file...")
     
-    # Sử dụng pandas để đọc và gộp file
-    dataframes = []
+    # Gộp theo luồng: chỉ đọc tiêu đề để hợp các cột, sau đó sao chép từng khối dòng,
+    # thêm thông tin nguồn (source_file) cho các file chưa có cột này
+    parquet_output = output_file.endswith('.parquet')
+    csv_output = output_file + '.csv' if parquet_output else output_file
+    counts = merge_csv_streaming(input_files, csv_output, source_column='source_file')
     
-    for file_path in input_files:
-        try:
-            # Đọc file CSV
-            df = pd.read_csv(file_path, encoding='utf-8')
-            
-            # Thêm thông tin nguồn (source) nếu chưa có trong dữ liệu
-            if 'source_file' not in df.columns:
-                df['source_file'] = os.path.basename(file_path)
-            
-            dataframes.append(df)
-            print(f"✓ Đã đọc file: {file_path} - {len(df)} dòng")
-        except Exception as e:
-            print(f"⚠️ Lỗi khi đọc file {file_path}: {str(e)}")
+    for file_path, count in counts.items():
+        print(f"✓ Đã đọc file: {file_path} - {count} dòng")
     
-    if not dataframes:
+    if not counts:
+        os.remove(csv_output)
         print("❌ Không có dữ liệu để gộp.")
         return
     
-    # Gộp tất cả dataframe
-    merged_df = pd.concat(dataframes, ignore_index=True)
-    
-    # Tạo thư mục đích nếu chưa tồn tại
-    output_dir = os.path.dirname(output_file)
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    
-    # Lưu vào file kết quả
-    merged_df.to_csv(output_file, index=False, encoding='utf-8')
+    # File .parquet được ghi dạng cột, có kiểu dữ liệu
+    if parquet_output:
+        # Chuyển theo từng khối (không nạp lại toàn bộ file CSV vào bộ nhớ)
+        try:
+            csv_to_parquet(csv_output, output_file)
+        finally:
+            os.remove(csv_output)
     
-    print(f"\n✅ Đã gộp {len(dataframes)} file thành công!")
-    print(f"✅ Tổng số dòng: {len(merged_df)}")
+    print(f"\n✅ Đã gộp {len(counts)} file thành công!")
+    print(f"✅ Tổng số dòng: {sum(counts.values())}")
     print(f"✅ File kết quả: {output_file}")
 
 if __name__ == "__main__":
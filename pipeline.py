@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+# Thêm thư mục gốc vào path để import
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from config import LOG_FORMAT, FEATURE_STORE_DIR, MODEL_DIR
+
+logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+logger = logging.getLogger(__name__)
+
+# Các file kết quả trong thư mục mô hình
+MODEL_FILE = 'model.joblib'
+SCALER_FILE = 'scaler.joblib'
+PLAYERS_FILE = 'players.parquet'
+METADATA_FILE = 'metadata.json'
+
+# Tên các kết quả trận đấu theo nhãn 0/1/2
+RESULT_LABELS = ['Đội nhà thắng', 'Hòa', 'Đội khách thắng']
+
+# Lưới tham số tinh chỉnh (giống train.ipynb)
+PARAM_GRIDS = {
+    'rf': {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [None, 10, 20, 30],
+        'min_samples_split': [2, 5, 10],
+        'min_samples_leaf': [1, 2, 4]
+    },
+    'svm': {
+        'estimator__C': [0.1, 1, 10],
+        'estimator__kernel': ['rbf', 'linear'],
+        'estimator__gamma': ['scale', 'auto', 0.1]
+    },
+}
+
+
+@contextmanager
+def stage(name, timings):
+    """Đo thời gian chạy của một bước và ghi vào timings"""
+    logger.info(f"[{name}] Bắt đầu")
+    start = time.time()
+    yield
+    timings[name] = round(time.time() - start, 3)
+    logger.info(f"[{name}] Xong trong {timings[name]:.2f} giây")
+
+
+def build_model(name):
+    """Tạo mô hình gốc theo tên (rf hoặc svm)"""
+    if name == 'svm':
+        from sklearn.multiclass import OneVsRestClassifier
+        from sklearn.svm import SVC
+        return OneVsRestClassifier(SVC(probability=True))
+    from sklearn.ensemble import RandomForestClassifier
+    return RandomForestClassifier(random_state=42)
+
+
+def run_train(args):
+    """Chạy toàn bộ quy trình: làm sạch -> đặc trưng -> chuẩn hóa -> huấn luyện -> lưu mô hình"""
+    import joblib
+    import numpy as np
+    import pandas as pd
+    from sklearn.metrics import accuracy_score
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import MinMaxScaler
+
+    from process_data.cleaning import clean_players, ensure_season
+    from process_data.lineups import lineup_name_columns, resolve_lineup_ids
+    from train.feature_matrix import feature_columns
+    from train.feature_store import FeatureStore
+    from train.features import POSITION_GROUPS
+    from train.player_index import PlayerIndex
+    from train.search import run_search
+
+    timings = {}
+
+    with stage('clean', timings):
+        players_df = clean_players(pd.read_csv(args.players))
+        matches_df = ensure_season(pd.read_csv(args.matches))
+        if 'season' not in matches_df.columns:
+            logger.error("Dữ liệu trận đấu không có cột season hoặc kickoff_millis")
+            return 1
+        columns = lineup_name_columns(matches_df, include_subs=False)
+        matches_df, miss_report = resolve_lineup_ids(matches_df, players_df, columns)
+        logger.info(f"{len(players_df)} dòng cầu thủ, {len(matches_df)} trận đấu, "
+                    f"{len(miss_report)} tên cầu thủ không tìm thấy player_id")
+
+    with stage('features', timings):
+        player_index = PlayerIndex(players_df)
+        df = FeatureStore(args.feature_store).build(matches_df, player_index)
+        logger.info(f"{len(df)}/{len(matches_df)} trận đấu đủ cầu thủ ở mọi vị trí")
+
+    with stage('scale', timings):
+        columns = feature_columns(df)
+        scaler = MinMaxScaler()
+        X = scaler.fit_transform(df[columns]).astype('float32')
+        y = df['result'].to_numpy()
+
+    train_idx, test_idx = train_test_split(np.arange(len(df)), test_size=args.test_size, random_state=42)
+
+    with stage('fit', timings):
+        if args.search:
+            results = run_search({args.model: (build_model(args.model), PARAM_GRIDS[args.model])},
+                                 X[train_idx], y[train_idx], cv=args.cv, halving=args.halving,
+                                 n_jobs=args.jobs)
+            model = results[args.model].best_estimator
+            params = results[args.model].best_params
+        else:
+            model = build_model(args.model).fit(X[train_idx], y[train_idx])
+            params = {}
+
+    with stage('evaluate', timings):
+        accuracy = float(accuracy_score(y[test_idx], model.predict(X[test_idx])))
+        logger.info(f"Độ chính xác trên tập kiểm tra: {accuracy:.4f}")
+
+    with stage('save', timings):
+        os.makedirs(args.output, exist_ok=True)
+        joblib.dump(model, os.path.join(args.output, MODEL_FILE))
+        joblib.dump(scaler, os.path.join(args.output, SCALER_FILE))
+
+        # Bảng cầu thủ thu gọn (chỉ các cột cần để tạo đặc trưng) cho lệnh predict
+        attributes = sorted({attr for attrs in POSITION_GROUPS.values() for attr in attrs} & set(players_df.columns))
+        keep = [col for col in ['player_id', 'name', 'season', 'position'] if col in players_df.columns]
+        players_df[keep + attributes].to_parquet(os.path.join(args.output, PLAYERS_FILE), index=False)
+
+        metadata = {
+            'model': args.model,
+            'params': {key: repr(value) for key, value in params.items()},
+            'columns': columns,
+            'groups': POSITION_GROUPS,
+            'inputs': {'players': args.players, 'matches': args.matches},
+            'rows': {'train': int(len(train_idx)), 'test': int(len(test_idx))},
+            'accuracy': accuracy,
+            'timings': timings,
+            'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        with open(os.path.join(args.output, METADATA_FILE), 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+    logger.info(f"Đã lưu mô hình vào {args.output} (thời gian từng bước: {timings})")
+    return 0
+
+
+def load_fixtures(path):
+    """Đọc danh sách trận đấu cần dự đoán từ CSV hoặc JSON/JSONL của spider"""
+    import pandas as pd
+
+    if path.endswith('.csv'):
+        return pd.read_csv(path)
+
+    from convert_json_to_csv.json_to_csv import iter_match_rows
+    return pd.DataFrame(list(iter_match_rows([path], quiet=True)))
+
+
+def run_predict(args):
+    """Dự đoán kết quả các trận đấu sắp diễn ra bằng mô hình đã lưu"""
+    import joblib
+    import numpy as np
+    import pandas as pd
+
+    from process_data.cleaning import ensure_season
+    from process_data.lineups import lineup_name_columns, resolve_lineup_ids
+    from train.features import build_training_dataframe
+
+    with open(os.path.join(args.model_dir, METADATA_FILE), 'r', encoding='utf-8') as f:
+        metadata = json.load(f)
+    model = joblib.load(os.path.join(args.model_dir, MODEL_FILE))
+    scaler = joblib.load(os.path.join(args.model_dir, SCALER_FILE))
+    players_df = pd.read_parquet(os.path.join(args.model_dir, PLAYERS_FILE))
+
+    fixtures = ensure_season(load_fixtures(args.fixtures))
+    if args.season:
+        fixtures['season'] = args.season
+    if 'season' not in fixtures.columns:
+        logger.error("Không xác định được mùa giải của các trận đấu, dùng --season")
+        return 1
+    for col in ['home_score', 'away_score']:
+        if col not in fixtures.columns:
+            fixtures[col] = np.nan
+
+    name_columns = lineup_name_columns(fixtures, include_subs=False)
+    if name_columns:
+        fixtures, _ = resolve_lineup_ids(fixtures, players_df, name_columns)
+
+    features = build_training_dataframe(fixtures, players_df, metadata['groups'])
+    skipped = sorted(set(fixtures['match_id']) - set(features['match_id']))
+    if skipped:
+        logger.warning(f"Bỏ qua {len(skipped)} trận đấu thiếu đội hình hoặc cầu thủ ở một vị trí: {skipped[:20]}")
+    if features.empty:
+        logger.error("Không có trận đấu nào đủ dữ liệu để dự đoán")
+        return 1
+
+    X = scaler.transform(features[metadata['columns']]).astype('float32')
+    probabilities = model.predict_proba(X)
+    predictions = pd.DataFrame({'match_id': features['match_id'], 'season': features['season']})
+    for i, label in enumerate(model.classes_):
+        predictions[f"prob_{int(label)}"] = probabilities[:, i].round(4)
+    predicted = model.classes_[probabilities.argmax(axis=1)]
+    predictions['prediction'] = predicted
+    predictions['prediction_label'] = [RESULT_LABELS[int(label)] for label in predicted]
+
+    if args.output:
+        predictions.to_csv(args.output, index=False)
+        logger.info(f"Đã lưu {len(predictions)} dự đoán vào {args.output}")
+    else:
+        print(predictions.to_string(index=False))
+    return 0
+
+
+def parse_args():
+    """Xử lý tham số dòng lệnh"""
+    parser = argparse.ArgumentParser(description='Huấn luyện mô hình dự đoán kết quả trận đấu và dự đoán trận đấu sắp diễn ra')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    train = subparsers.add_parser('train', help='Làm sạch dữ liệu, tạo đặc trưng, chuẩn hóa và huấn luyện mô hình')
+    train.add_argument('--players', default='data/data_csv/player/all_players_cleaned.csv',
+                       help='File CSV dữ liệu cầu thủ')
+    train.add_argument('--matches', default='data/data_csv/match/all_seasons_combined.csv',
+                       help='File CSV dữ liệu trận đấu')
+    train.add_argument('--model', choices=['rf', 'svm'], default='rf',
+                       help='Mô hình: rf (Random Forest, mặc định) hoặc svm')
+    train.add_argument('--search', action='store_true',
+                       help='Tinh chỉnh tham số bằng train/search.py (có cache kết quả từng fold)')
+    train.add_argument('--halving', action='store_true',
+                       help='Dùng successive halving khi tinh chỉnh tham số')
+    train.add_argument('--cv', type=int, default=5, help='Số fold khi tinh chỉnh (mặc định: 5)')
+    train.add_argument('--jobs', type=int, default=-1, help='Số tiến trình song song (mặc định: tất cả CPU)')
+    train.add_argument('--test-size', type=float, default=0.2, help='Tỉ lệ tập kiểm tra (mặc định: 0.2)')
+    train.add_argument('--feature-store', default=FEATURE_STORE_DIR,
+                       help=f'Thư mục kho đặc trưng (mặc định: {FEATURE_STORE_DIR})')
+    train.add_argument('-o', '--output', default=MODEL_DIR,
+                       help=f'Thư mục lưu mô hình, scaler và metadata (mặc định: {MODEL_DIR})')
+
+    predict = subparsers.add_parser('predict', help='Dự đoán kết quả trận đấu bằng mô hình đã huấn luyện')
+    predict.add_argument('fixtures', help='File trận đấu cần dự đoán (CSV, JSON hoặc JSONL của spider) có đội hình đá chính')
+    predict.add_argument('--model-dir', default=MODEL_DIR,
+                         help=f'Thư mục mô hình đã lưu (mặc định: {MODEL_DIR})')
+    predict.add_argument('--season', help='Mùa giải của các trận đấu (nếu file không có cột season)')
+    predict.add_argument('-o', '--output', help='File CSV kết quả (mặc định: in ra màn hình)')
+
+    return parser.parse_args()
+
+
+# ==== CÁCH DÙNG ====
+# python pipeline.py train --search
+# python pipeline.py predict data/fixtures_2024-2025.jsonl --season 2024-2025
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == 'train':
+        sys.exit(run_train(args))
+    sys.exit(run_predict(args))
@@ -0,0 +1,119 @@
+import logging
+import os
+import sys
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Thêm thư mục gốc vào path để import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import SEASON_DATES
+
+logger = logging.getLogger(__name__)
+
+# Tỷ lệ null (%) tối đa của một cột dữ liệu cầu thủ, vượt quá thì xóa cột
+NULL_THRESHOLD = 80
+
+# Nhóm vị trí dùng khi tạo đặc trưng (B thay vì D), theo từ khóa trong positionInfo
+POSITION_KEYWORDS = [
+    ('G', ('goalkeeper',)),
+    ('B', ('defender', 'back')),
+    ('M', ('midfielder',)),
+    ('F', ('striker', 'forward', 'winger')),
+]
+# Vị trí dạng một chữ cái của API (info.position / matchPosition)
+POSITION_CODES = {'G': 'G', 'D': 'B', 'B': 'B', 'M': 'M', 'F': 'F'}
+
+# Mùa giải bắt đầu từ tháng 7 (chỉ dùng cho trận ngoài các khoảng ngày trong SEASON_DATES)
+SEASON_START_MONTH = 7
+
+
+def convert_age_to_decimal(age_str):
+    """Chuyển chuỗi tuổi dạng 'X year Y day' thành số năm"""
+    if isinstance(age_str, (int, float)):
+        return int(age_str)
+    return int(str(age_str).lower().split()[0])
+
+
+def position_group(position) -> Optional[str]:
+    """Nhóm vị trí G/B/M/F của một cầu thủ (None nếu không xác định được)"""
+    if pd.isna(position):
+        return None
+    value = str(position).strip()
+    if value.upper() in POSITION_CODES:
+        return POSITION_CODES[value.upper()]
+    lower = value.lower()
+    for group, keywords in POSITION_KEYWORDS:
+        if any(keyword in lower for keyword in keywords):
+            return group
+    return None
+
+
+def clean_players(df: pd.DataFrame, null_threshold: float = NULL_THRESHOLD) -> pd.DataFrame:
+    """Làm sạch dữ liệu cầu thủ theo các bước của process.ipynb
+
+    - Bỏ dòng thiếu tuổi, chuyển tuổi thành số năm
+    - Xóa bản ghi trùng lặp và các cột team_name, team_short_name
+    - Xóa cột có tỷ lệ null lớn hơn null_threshold (%)
+    - Điền giá trị thiếu của cột số bằng trung bình theo vị trí, sau đó trung bình chung
+    - Chuyển vị trí thành nhóm G/B/M/F
+    """
+    if 'age' in df.columns:
+        df = df.dropna(subset=['age']).copy()
+        df['age'] = df['age'].apply(convert_age_to_decimal)
+
+    df = df.drop_duplicates()
+    df = df.drop(columns=[col for col in ['team_name', 'team_short_name'] if col in df.columns])
+
+    null_percentages = df.isnull().sum() / len(df) * 100 if len(df) else pd.Series(dtype=float)
+    df = df.drop(columns=null_percentages[null_percentages > null_threshold].index.tolist())
+
+    numeric_columns = df.select_dtypes(include=['float64', 'int64']).columns
+    filled = {}
+    for col in numeric_columns:
+        if df[col].isnull().any():
+            values = df[col].fillna(df.groupby('position')[col].transform('mean'))
+            filled[col] = values.fillna(values.mean())
+    if filled:
+        df = df.assign(**filled)
+
+    df = df.copy()
+    df['position'] = df['position'].map(position_group)
+    return df.reset_index(drop=True)
+
+
+def season_from_kickoff(kickoff_millis: pd.Series,
+                        season_dates: Optional[Dict[str, Tuple[str, str]]] = None) -> pd.Series:
+    """Mùa giải (ví dụ '2024-2025') từ thời điểm bắt đầu trận đấu (mili giây)
+
+    Trận nằm trong khoảng [ngày đầu, ngày cuối] của một mùa trong season_dates
+    (mặc định config.SEASON_DATES) được gán mùa đó. Trận ngoài mọi khoảng (ví dụ mùa
+    chưa có trong config) được suy ra theo ranh giới cố định tháng 7; ranh giới này sai
+    với mùa kết thúc muộn như 2019-2020 (đá bù tới tháng 7/2020), nên có cảnh báo khi
+    các trận đó rơi vào tháng 7.
+    """
+    season_dates = SEASON_DATES if season_dates is None else season_dates
+    kickoff = pd.to_datetime(pd.to_numeric(kickoff_millis, errors='coerce'), unit='ms', utc=True)
+    day = kickoff.dt.tz_localize(None).dt.normalize()
+
+    season = pd.Series(None, index=kickoff_millis.index, dtype=object)
+    for name, (first, last) in season_dates.items():
+        season[day.between(pd.Timestamp(first), pd.Timestamp(last)).to_numpy()] = name
+
+    fallback = season.isna() & kickoff.notna()
+    if fallback.any():
+        start_year = kickoff[fallback].dt.year - (kickoff[fallback].dt.month < SEASON_START_MONTH).astype(int)
+        season[fallback] = start_year.astype(str) + '-' + (start_year + 1).astype(str)
+        july = int((kickoff[fallback].dt.month == SEASON_START_MONTH).sum())
+        if july:
+            logger.warning(f"{july} trận ngoài khoảng ngày của các mùa trong SEASON_DATES rơi vào tháng 7, "
+                           f"mùa giải suy ra theo ranh giới tháng 7 có thể sai")
+    return season
+
+
+def ensure_season(matches_df: pd.DataFrame) -> pd.DataFrame:
+    """Thêm cột season cho dữ liệu trận đấu cũ chưa có (tính từ kickoff_millis)"""
+    if 'season' in matches_df.columns or 'kickoff_millis' not in matches_df.columns:
+        return matches_df
+    return pd.concat([matches_df, season_from_kickoff(matches_df['kickoff_millis']).rename('season')], axis=1)
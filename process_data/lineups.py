@@ -0,0 +1,138 @@
+import argparse
+import re
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Cột tên cầu thủ trong đội hình, ví dụ home_starting_1_name, away_sub_9_name
+LINEUP_NAME_PATTERN = re.compile(r'^(home|away)_(starting|sub)_(\d+)_name$')
+
+
+def lineup_name_columns(matches_df: pd.DataFrame, include_subs: bool = True) -> List[str]:
+    """Danh sách các cột tên cầu thủ trong đội hình (đá chính, và dự bị nếu include_subs)"""
+    columns = []
+    for col in matches_df.columns:
+        match = LINEUP_NAME_PATTERN.match(col)
+        if match and (include_subs or match.group(2) == 'starting'):
+            columns.append(col)
+    return columns
+
+
+def build_name_index(players_df: pd.DataFrame, name_col: str = 'name',
+                     id_col: str = 'player_id') -> pd.Series:
+    """Bảng tra tên -> player_id
+
+    Giống dict(zip(names, ids)): nếu một tên xuất hiện nhiều lần, player_id của
+    dòng cuối cùng được dùng.
+    """
+    pairs = players_df[[name_col, id_col]].dropna(subset=[name_col])
+    pairs = pairs.drop_duplicates(subset=[name_col], keep='last')
+    return pd.Series(pairs[id_col].to_numpy(), index=pd.Index(pairs[name_col].to_numpy(dtype=object), dtype=object))
+
+
+def ambiguous_names(players_df: pd.DataFrame, name_col: str = 'name',
+                    id_col: str = 'player_id') -> pd.Series:
+    """Các tên ứng với nhiều player_id khác nhau (tên -> số player_id)"""
+    counts = players_df.groupby(name_col)[id_col].nunique()
+    return counts[counts > 1]
+
+
+def resolve_lineup_ids(matches_df: pd.DataFrame, players_df: pd.DataFrame,
+                       columns: Optional[List[str]] = None, include_subs: bool = True,
+                       drop_names: bool = True) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Chuyển tất cả cột tên cầu thủ trong đội hình thành player_id trong một lượt
+
+    Toàn bộ ô tên của các cột đội hình được gom thành một mảng và tra cứu một lần
+    qua chỉ mục băm của bảng tên (Index.get_indexer), thay vì gọi hàm Python cho
+    từng ô. Nếu dữ liệu đã có cột *_player_id (lấy lúc thu thập), giá trị đó được
+    ưu tiên và tên chỉ được dùng cho các ô còn thiếu.
+
+    Args:
+        matches_df: Dữ liệu trận đấu có các cột *_starting_N_name / *_sub_N_name
+        players_df: Dữ liệu cầu thủ có cột name và player_id
+        columns: Các cột cần chuyển; mặc định lấy theo lineup_name_columns
+        include_subs: Có chuyển cả cột dự bị hay không (khi columns=None)
+        drop_names: Xóa các cột tên sau khi chuyển
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: (dữ liệu trận đấu với các cột *_player_id,
+        báo cáo tên không tìm thấy gồm row, match_id, column, name)
+    """
+    if columns is None:
+        columns = lineup_name_columns(matches_df, include_subs)
+
+    name_index = build_name_index(players_df)
+    names = matches_df[columns].to_numpy(dtype=object)
+    flat_names = names.ravel()
+
+    # Số tên khác nhau nhỏ hơn nhiều so với số ô: mã hóa các ô theo tên rồi chỉ tra cứu các tên khác nhau
+    codes, unique_names = pd.factorize(flat_names)
+    positions = np.where(codes >= 0, name_index.index.get_indexer(unique_names)[codes], -1)
+    found = positions >= 0
+    ids = np.full(flat_names.shape, np.nan)
+    ids[found] = name_index.to_numpy()[positions[found]]
+    ids = ids.reshape(names.shape)
+
+    id_columns = [col.replace('name', 'player_id') for col in columns]
+    id_frame = pd.DataFrame(ids, columns=id_columns, index=matches_df.index).astype('Int64')
+
+    # Dữ liệu mới đã có sẵn player_id lấy lúc thu thập: ưu tiên giá trị đó, chỉ dùng tên khi bị thiếu
+    existing = [col for col in id_columns if col in matches_df.columns]
+    if existing:
+        scraped = matches_df[existing].apply(pd.to_numeric, errors='coerce').astype('Int64')
+        id_frame[existing] = scraped.fillna(id_frame[existing])
+
+    result = matches_df.drop(columns=columns + existing) if drop_names else matches_df.drop(columns=existing)
+    result = pd.concat([result, id_frame], axis=1)
+
+    # Báo cáo các ô có tên nhưng không tìm thấy player_id
+    missing = (id_frame.isna().to_numpy() & pd.notna(names) & (names != ''))
+    row_pos, col_pos = np.nonzero(missing)
+    report = pd.DataFrame({
+        'row': matches_df.index.to_numpy()[row_pos],
+        'match_id': matches_df['match_id'].to_numpy()[row_pos] if 'match_id' in matches_df else None,
+        'column': np.asarray(columns, dtype=object)[col_pos],
+        'name': names[row_pos, col_pos],
+    })
+    return result, report
+
+
+def print_miss_report(report: pd.DataFrame, total_columns: int) -> None:
+    """In tóm tắt báo cáo tên không tìm thấy"""
+    print("\nThông tin xử lý:")
+    print(f"Số cột đã xử lý: {total_columns}")
+    print(f"\nTổng số tên không tìm thấy mapping: {len(report)}")
+    print(f"\nSố dòng có tên không tìm thấy mapping: {report['row'].nunique()}")
+    if not report.empty:
+        print("\nCác tên không tìm thấy nhiều nhất:")
+        print(report['name'].value_counts().head(10))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Chuyển tên cầu thủ trong đội hình thành player_id')
+    parser.add_argument('--players', default='data/data_csv/player/all_players_cleaned.csv',
+                        help='File CSV cầu thủ (có cột name, player_id)')
+    parser.add_argument('--matches', default='data/data_csv/match/all_seasons_combined.csv',
+                        help='File CSV trận đấu')
+    parser.add_argument('--output', default='data/data_csv/match/all_matches_processed.csv',
+                        help='File CSV kết quả')
+    parser.add_argument('--starting-only', action='store_true',
+                        help='Chỉ chuyển các cột đội hình đá chính')
+    parser.add_argument('--miss-report', help='Lưu báo cáo tên không tìm thấy ra file CSV')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    players_df = pd.read_csv(args.players)
+    matches_df = pd.read_csv(args.matches)
+
+    columns = lineup_name_columns(matches_df, include_subs=not args.starting_only)
+    matches_df, report = resolve_lineup_ids(matches_df, players_df, columns)
+    matches_df.to_csv(args.output, index=False)
+    print_miss_report(report, len(columns))
+
+    if args.miss_report:
+        report.to_csv(args.miss_report, index=False)
+        print(f"Đã lưu báo cáo tên không tìm thấy vào {args.miss_report}")
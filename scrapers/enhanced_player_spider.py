@@ -1,20 +1,25 @@
+import asyncio
 import json
 import csv
 import logging
-import requests
-import time
-import random
 import sys
 import os
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 from datetime import datetime
 
 # Thêm thư mục gốc vào path để import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import (
-    API_BASE_URL, API_HEADERS, SEASONS, get_output_path, 
-    LOG_FORMAT, LOG_FILE, MIN_DELAY, MAX_DELAY, get_random_headers
+    API_BASE_URL, SEASONS, get_output_path,
+    LOG_FORMAT, LOG_FILE, PARQUET_DIR, PLAYER_WORKERS
 )
+from utils.async_pipeline import ordered_map
+from utils.http_client import ApiClient
+from utils.retry import RequestFailedError
+from utils.pagination import fetch_listing
+from utils.checkpoint import CrawlCheckpoint
+from utils.jsonl import JsonlWriter
+from utils.parquet_io import write_parquet
 
 # Cấu hình logging
 logging.basicConfig(
@@ -27,31 +32,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Các trường thông tin chung mà danh sách cầu thủ của mùa giải (/players) đã trả về;
+# nếu đủ thì không cần gọi lại /players/{id}
+LISTING_FIELDS = ["name", "info", "nationalTeam", "birth", "currentTeam"]
+
+
+def missing_listing_fields(player_data: Dict) -> List[str]:
+    """Các trường thông tin chung còn thiếu trong bản ghi cầu thủ của danh sách mùa giải"""
+    missing = [field for field in LISTING_FIELDS if not player_data.get(field)]
+    if "name" not in missing and not player_data["name"].get("display"):
+        missing.append("name")
+    return missing
+
+
 class EnhancedPlayerSpider:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(API_HEADERS)
+    def __init__(self, workers: int = PLAYER_WORKERS, client: ApiClient = None, use_listing: bool = False):
+        self.workers = max(1, workers or 1)
         
-        # Đảm bảo có User-Agent
-        if 'User-Agent' not in self.session.headers:
-            self.session.headers.update({'User-Agent': random.choice(USER_AGENTS)})
+        # use_listing: dùng thông tin chung có sẵn trong danh sách cầu thủ của mùa giải,
+        # chỉ gọi /players/{id} khi danh sách thiếu trường
+        self.use_listing = use_listing
+        
+        # Thay đổi User-Agent mỗi lần gọi API; mỗi cầu thủ gửi 3 request cùng lúc
+        self.client = client or ApiClient(max_in_flight=self.workers * 3, rotate_user_agent=True)
 
-    def get_season_players(self, season_id: str) -> List[Dict]:
+    async def get_season_players(self, season_id: str) -> List[Dict]:
         """Lấy danh sách cầu thủ của một mùa giải"""
-        url = f"{API_BASE_URL}/players?pageSize=1000&compSeasons={season_id}"
+        url = f"{API_BASE_URL}/players?compSeasons={season_id}"
         
         try:
-            # Thêm delay ngẫu nhiên
-            time.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
-            
-            # Thay đổi User-Agent mỗi lần gọi API
-            self.session.headers.update(get_random_headers())
-            
-            response = self.session.get(url)
-            response.raise_for_status()
-            
-            data = response.json()
-            players = data.get("content", [])
+            # Đọc theo từng trang (song song), không giới hạn số cầu thủ
+            players = await fetch_listing(self.client, url)
             
             logger.info(f"Tìm thấy {len(players)} cầu thủ cho mùa giải {season_id}")
             
@@ -60,73 +71,56 @@ class EnhancedPlayerSpider:
             return sorted_players
         
         except Exception as e:
+            # Không trả danh sách rỗng/thiếu: để bên gọi báo lỗi cả mùa giải
             logger.error(f"Lỗi khi lấy danh sách cầu thủ: {str(e)}")
-            return []
+            raise
 
-    def get_player_general_info(self, player_id: int, season_id: str) -> Optional[Dict]:
+    async def get_player_general_info(self, player_id: int, season_id: str) -> Optional[Dict]:
         """Lấy thông tin chung về cầu thủ"""
         url = f"{API_BASE_URL}/players/{player_id}?comps=1&compSeasons={season_id}"
         
         try:
-            # Thêm delay ngẫu nhiên
-            time.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
-            
-            # Thay đổi User-Agent mỗi lần gọi API
-            self.session.headers.update(get_random_headers())
-            
-            response = self.session.get(url)
-            response.raise_for_status()
-            
-            return response.json()
+            return await self.client.get_json(url)
+        except RequestFailedError:
+            # Lỗi tạm thời vẫn còn sau khi thử lại: không coi là "không có dữ liệu"
+            raise
         except Exception as e:
             logger.error(f"Lỗi khi lấy thông tin chung về cầu thủ {player_id}: {str(e)}")
             return None
 
-    def get_player_stats(self, player_id: int, season_id: str) -> Optional[Dict]:
+    async def get_player_stats(self, player_id: int, season_id: str) -> Optional[Dict]:
         """Lấy thống kê chi tiết của cầu thủ trong một mùa giải"""
         url = f"{API_BASE_URL}/stats/player/{player_id}?comps=1&compSeasons={season_id}"
         
         try:
-            # Thêm delay ngẫu nhiên
-            time.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
-            
-            # Thay đổi User-Agent mỗi lần gọi API
-            self.session.headers.update(get_random_headers())
-            
-            response = self.session.get(url)
-            response.raise_for_status()
-            
-            return response.json()
+            return await self.client.get_json(url)
         
+        except RequestFailedError:
+            # Lỗi tạm thời vẫn còn sau khi thử lại: không coi là "không có dữ liệu"
+            raise
         except Exception as e:
             logger.error(f"Lỗi khi lấy thống kê cầu thủ {player_id}: {str(e)}")
             return None
     
-    def get_player_match_stats(self, player_id: int, season_id: str) -> Optional[Dict]:
+    async def get_player_match_stats(self, player_id: int, season_id: str) -> Optional[Dict]:
         """Lấy thống kê trận đấu của cầu thủ"""
         url = f"{API_BASE_URL}/players/match-stats?playerId={player_id}&compSeason={season_id}"
         
         try:
-            # Thêm delay ngẫu nhiên
-            time.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
-            
-            # Thay đổi User-Agent mỗi lần gọi API
-            self.session.headers.update(get_random_headers())
-            
-            response = self.session.get(url)
+            match_stats = await self.client.get_json(url)
             
             # Kiểm tra nếu không có dữ liệu (204 No Content)
-            if response.status_code == 204:
+            if match_stats is None:
                 logger.info(f"Không có thống kê trận đấu cho cầu thủ {player_id}")
-                return None
-                
-            response.raise_for_status()
             
-            return response.json()
+            return match_stats
         
+        except RequestFailedError:
+            # Lỗi tạm thời vẫn còn sau khi thử lại: không coi là "không có dữ liệu"
+            raise
         except Exception as e:
             # Nhiều cầu thủ sẽ không có thống kê trận đấu, đây không phải lỗi nghiêm trọng
-            if "404" in str(e):
+            if getattr(e, "status", None) == 404:
                 logger.info(f"Không có thống kê trận đấu cho cầu thủ {player_id}")
                 return None
             logger.error(f"Lỗi khi lấy thống kê trận đấu của cầu thủ {player_id}: {str(e)}")
@@ -225,7 +219,7 @@ class EnhancedPlayerSpider:
         
         return result
 
-    def scrape_player(self, player_data: Dict, season: str, season_id: str) -> Optional[Dict]:
+    async def scrape_player(self, player_data: Dict, season: str, season_id: str) -> Optional[Dict]:
         """Thu thập dữ liệu đầy đủ cho một cầu thủ"""
         player_id = int(player_data.get("id", 0))
         player_name = player_data.get("name", {}).get("display", "Unknown")
@@ -236,10 +230,18 @@ class EnhancedPlayerSpider:
         
         logger.info(f"Thu thập dữ liệu cho cầu thủ: {player_name} (ID: {player_id})")
         
-        # Thu thập thông tin từ các API
-        general_info = self.get_player_general_info(player_id, season_id)
-        stats_data = self.get_player_stats(player_id, season_id)
-        match_stats = self.get_player_match_stats(player_id, season_id)
+        # Thông tin chung lấy từ danh sách mùa giải nếu đủ trường, không thì gọi /players/{id}
+        if self.use_listing and not missing_listing_fields(player_data):
+            general_request = asyncio.sleep(0, result=player_data)
+        else:
+            general_request = self.get_player_general_info(player_id, season_id)
+        
+        # Gửi đồng thời các request (thông tin chung, thống kê mùa giải, thống kê từng trận)
+        general_info, stats_data, match_stats = await asyncio.gather(
+            general_request,
+            self.get_player_stats(player_id, season_id),
+            self.get_player_match_stats(player_id, season_id)
+        )
         
         # Trích xuất dữ liệu
         player_full_data = self.extract_player_data(general_info, stats_data, match_stats, season)
@@ -252,35 +254,94 @@ class EnhancedPlayerSpider:
         
         return player_full_data
 
-    def scrape_season(self, season: str, max_players: int = None) -> List[Dict]:
-        """Thu thập dữ liệu cầu thủ cho một mùa giải"""
+    async def iter_season(self, season: str, max_players: int = None, resume: bool = False) -> AsyncIterator[Dict]:
+        """Thu thập dữ liệu cầu thủ một mùa giải, trả lần lượt từng cầu thủ theo đúng thứ tự
+        (nhiều cầu thủ được thu thập song song)"""
         season_id = SEASONS.get(season)
         if not season_id:
             logger.error(f"Không tìm thấy ID cho mùa giải {season}")
-            return []
+            return
         
         logger.info(f"Bắt đầu thu thập dữ liệu cầu thủ cho mùa giải {season} (ID: {season_id})")
         
+        # Checkpoint: bỏ qua các cầu thủ đã thu thập ở lần chạy trước nếu resume
+        checkpoint = CrawlCheckpoint("players_enhanced", season)
+        completed = checkpoint.open(resume)
+        
         # Lấy danh sách cầu thủ
-        players = self.get_season_players(season_id)
+        players = await self.get_season_players(season_id)
         
         # Giới hạn số lượng cầu thủ nếu cần
         if max_players and max_players < len(players):
             logger.info(f"Giới hạn thu thập {max_players}/{len(players)} cầu thủ")
             players = players[:max_players]
         
-        players_data = []
+        remaining = sum(1 for player in players if str(player.get("id")) not in completed)
+        logger.info(f"Thu thập {remaining}/{len(players)} cầu thủ với {self.workers} tác vụ song song")
+        
+        failed = []
         
-        # Thu thập dữ liệu cho từng cầu thủ
-        for i, player in enumerate(players, 1):
+        async def scrape_one(item) -> Optional[Dict]:
+            i, player = item
+            if str(player.get("id")) in completed:
+                return completed.pop(str(player.get("id")))
+            
             logger.info(f"[{i}/{len(players)}] Đang thu thập dữ liệu cho cầu thủ ID: {player.get('id')}")
-            player_data = self.scrape_player(player, season, season_id)
+            try:
+                player_data = await self.scrape_player(player, season, season_id)
+            except RequestFailedError as e:
+                # Không ghi checkpoint để lần chạy --resume sau thu thập lại
+                logger.error(f"Bỏ qua cầu thủ {player.get('id')}: {str(e)}")
+                failed.append(player.get("id"))
+                return None
             
             if player_data:
-                players_data.append(player_data)
+                checkpoint.record(player.get("id"), player_data)
+            return player_data
         
-        logger.info(f"Đã thu thập dữ liệu cho {len(players_data)}/{len(players)} cầu thủ")
-        return players_data
+        collected = 0
+        async for player_data in ordered_map(scrape_one, enumerate(players, 1), self.workers):
+            if player_data:
+                collected += 1
+                yield player_data
+        
+        logger.info(f"Đã thu thập dữ liệu cho {collected}/{len(players)} cầu thủ")
+        if failed:
+            logger.warning(f"{len(failed)} cầu thủ bị lỗi, chạy lại với --resume để thu thập tiếp: {failed[:20]}")
+
+    async def scrape_season_async(self, season: str, max_players: int = None, resume: bool = False) -> List[Dict]:
+        """Thu thập dữ liệu cầu thủ cho một mùa giải"""
+        return [player_data async for player_data in self.iter_season(season, max_players, resume)]
+
+    def scrape_season(self, season: str, max_players: int = None, resume: bool = False) -> List[Dict]:
+        """Thu thập dữ liệu cầu thủ cho một mùa giải"""
+        return self.client.run(self.scrape_season_async(season, max_players, resume))
+
+    async def stream_season_jsonl(self, season: str, max_players: int = None, resume: bool = False) -> Optional[str]:
+        """Thu thập một mùa giải và ghi ngay từng cầu thủ vào file JSONL"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"players_enhanced_{season.replace('-', '_')}_{timestamp}.jsonl"
+        output_path = os.path.join("data", filename)
+        
+        with JsonlWriter(output_path) as writer:
+            async for player_data in self.iter_season(season, max_players, resume):
+                writer.write(player_data)
+        
+        if writer.count == 0:
+            os.remove(output_path)
+            logger.warning(f"Không có dữ liệu để lưu cho mùa giải {season}")
+            return None
+        
+        logger.info(f"Đã lưu {writer.count} cầu thủ vào {output_path}")
+        return output_path
+
+    def scrape_season_jsonl(self, season: str, max_players: int = None, resume: bool = False) -> Optional[str]:
+        """Thu thập một mùa giải ở chế độ ghi luồng JSONL (bộ nhớ không tăng theo số cầu thủ)"""
+        return self.client.run(self.stream_season_jsonl(season, max_players, resume))
+
+    def scrape_single_player(self, player_data: Dict, season: str, season_id: str) -> Optional[Dict]:
+        """Thu thập dữ liệu đầy đủ cho một cầu thủ (gọi từ code đồng bộ)"""
+        return self.client.run(self.scrape_player(player_data, season, season_id))
 
     def save_data_json(self, data: List[Dict], season: str) -> str:
         """Lưu dữ liệu vào file JSON"""
@@ -301,6 +362,20 @@ class EnhancedPlayerSpider:
         logger.info(f"Đã lưu {len(data)} cầu thủ vào {output_path}")
         return output_path
     
+    def save_data_parquet(self, data: List[Dict], season: str) -> str:
+        """Lưu dữ liệu vào dataset Parquet (cột có kiểu, chia phân vùng theo mùa giải)"""
+        if not data:
+            logger.warning(f"Không có dữ liệu để lưu cho mùa giải {season}")
+            return None
+        
+        # Loại bỏ trường match_details vì nó là một list (đã có file chi tiết trận đấu riêng)
+        data = [{k: v for k, v in item.items() if k != "match_details"} for item in data]
+
+        output_path = write_parquet(data, os.path.join(PARQUET_DIR, "players_enhanced"))
+        
+        logger.info(f"Đã lưu {len(data)} cầu thủ vào {output_path}")
+        return output_path
+    
     def save_data_csv(self, data: List[Dict], season: str) -> str:
         """Lưu dữ liệu vào file CSV"""
         if not data:
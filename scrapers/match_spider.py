@@ -1,20 +1,27 @@
 import json
 import csv
 import logging
-import requests
-import time
-import random
+import asyncio
 import sys
 import os
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 from datetime import datetime
 
 # Thêm thư mục gốc vào path để import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import (
-    API_BASE_URL, API_HEADERS, SEASONS, get_output_path, 
-    LOG_FORMAT, LOG_FILE, MIN_DELAY, MAX_DELAY
+    API_BASE_URL, SEASONS, get_output_path,
+    LOG_FORMAT, LOG_FILE, PARQUET_DIR, MATCH_WORKERS
 )
+from utils.http_client import ApiClient
+from utils.retry import RequestFailedError
+from utils.checkpoint import CrawlCheckpoint
+from utils.async_pipeline import ordered_map
+from utils.pagination import fetch_listing, iter_listing
+from utils.jsonl import JsonlWriter
+from utils.parquet_io import write_parquet
+from utils.manifest import SeasonManifest
+from utils.progress import CrawlProgress
 
 # Cấu hình logging
 logging.basicConfig(
@@ -28,71 +35,71 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class MatchSpider:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(API_HEADERS)
-
-    def get_season_matches(self, season_id: str) -> List[int]:
-        """Lấy danh sách ID trận đấu của một mùa giải"""
-        url = f"{API_BASE_URL}/fixtures?comps=1&compSeasons={season_id}&page=0&pageSize=2000"
+    def __init__(self, workers: int = MATCH_WORKERS, client: ApiClient = None,
+                 progress: CrawlProgress = None):
+        self.workers = max(1, workers or 1)
+        self.progress = progress
         
+        # Mọi tác vụ dùng chung bộ giới hạn tốc độ của client
+        self.client = client or ApiClient(max_in_flight=self.workers * 2)
+
+    @staticmethod
+    def fixtures_url(season_id: str) -> str:
+        """URL danh sách trận đấu của một mùa giải (đọc theo từng trang)"""
+        return f"{API_BASE_URL}/fixtures?comps=1&compSeasons={season_id}"
+
+    async def get_season_fixtures(self, season_id: str) -> List[Dict]:
+        """Lấy danh sách trận đấu (bản tóm tắt từ API) của một mùa giải"""
         try:
-            # Thêm delay ngẫu nhiên
-            time.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
-            
-            response = self.session.get(url)
-            
-            # In ra thông tin chi tiết về phản hồi
-            logger.info(f"URL: {url}")
-            logger.info(f"Status code: {response.status_code}")
-            logger.info(f"Headers: {dict(response.headers)}")
-            logger.info(f"Response: {response.text[:500]}...")  # In 500 ký tự đầu tiên
+            # Đọc theo từng trang (song song), không giới hạn số trận đấu
+            fixtures = await fetch_listing(self.client, self.fixtures_url(season_id))
             
-            response.raise_for_status()
-            
-            data = response.json()
-            match_ids = []
-            
-            for match in data.get("content", []):
-                match_ids.append(int(match.get("id")))
-            
-            logger.info(f"Tìm thấy {len(match_ids)} trận đấu cho mùa giải {season_id}")
-            return match_ids
+            logger.info(f"Tìm thấy {len(fixtures)} trận đấu cho mùa giải {season_id}")
+            return fixtures
         
         except Exception as e:
+            # Không trả danh sách rỗng/thiếu: để bên gọi báo lỗi cả mùa giải
             logger.error(f"Lỗi khi lấy danh sách trận đấu: {str(e)}")
-            return []
+            raise
 
-    def get_match_data(self, match_id: int) -> Optional[Dict]:
+    async def get_season_matches(self, season_id: str) -> List[int]:
+        """Lấy danh sách ID trận đấu của một mùa giải"""
+        fixtures = await self.get_season_fixtures(season_id)
+        return [int(fixture.get("id")) for fixture in fixtures]
+
+    @staticmethod
+    def fixture_state(fixture: Dict) -> Dict:
+        """Trạng thái của một trận trong danh sách, dùng để phát hiện trận đã thay đổi"""
+        return {
+            "status": fixture.get("status"),
+            "kickoff": (fixture.get("kickoff") or {}).get("millis"),
+            "scores": [team.get("score") for team in fixture.get("teams") or []],
+        }
+
+    async def get_match_data(self, match_id: int, season: str = None) -> Optional[Dict]:
         """Lấy thông tin chi tiết về trận đấu"""
         url = f"{API_BASE_URL}/fixtures/{match_id}?altIds=true"
         
         try:
-            # Thêm delay ngẫu nhiên
-            time.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
-            
-            response = self.session.get(url)
-            response.raise_for_status()
-            
-            return response.json()
+            return await self.client.get_json(url, season=season)
         
+        except RequestFailedError:
+            # Lỗi tạm thời vẫn còn sau khi thử lại: không coi là "không có dữ liệu"
+            raise
         except Exception as e:
             logger.error(f"Lỗi khi lấy thông tin trận đấu {match_id}: {str(e)}")
             return None
 
-    def get_match_stats(self, match_id: int) -> Optional[Dict]:
+    async def get_match_stats(self, match_id: int, season: str = None) -> Optional[Dict]:
         """Lấy thống kê của trận đấu"""
         url = f"{API_BASE_URL}/stats/match/{match_id}"
         
         try:
-            # Thêm delay ngẫu nhiên
-            time.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
-            
-            response = self.session.get(url)
-            response.raise_for_status()
-            
-            return response.json()
+            return await self.client.get_json(url, season=season)
         
+        except RequestFailedError:
+            # Lỗi tạm thời vẫn còn sau khi thử lại: không coi là "không có dữ liệu"
+            raise
         except Exception as e:
             logger.error(f"Lỗi khi lấy thống kê trận đấu {match_id}: {str(e)}")
             return None
@@ -124,37 +131,126 @@ class MatchSpider:
         
         return combined_data
 
-    def scrape_match(self, match_id: int, season: str) -> Optional[Dict]:
+    async def scrape_match(self, match_id: int, season: str) -> Optional[Dict]:
         """Thu thập dữ liệu cho một trận đấu"""
-        match_data = self.get_match_data(match_id)
+        # Gửi đồng thời cả 2 request (thông tin + thống kê) của trận đấu
+        match_data, stats_data = await asyncio.gather(
+            self.get_match_data(match_id, season),
+            self.get_match_stats(match_id, season)
+        )
         if not match_data:
             return None
         
-        stats_data = self.get_match_stats(match_id)
-        
         # Trích xuất dữ liệu quan trọng
         extracted_data = self.extract_match_data(match_data, stats_data, season)
         
         return extracted_data
 
-    def scrape_season(self, season: str) -> List[Dict]:
-        """Thu thập dữ liệu cho một mùa giải"""
+    async def iter_season(self, season: str, resume: bool = False,
+                          incremental: bool = False) -> AsyncIterator[Dict]:
+        """Thu thập dữ liệu một mùa giải, trả lần lượt từng trận theo đúng thứ tự
+        (nhiều trận đấu được thu thập song song)
+        
+        incremental: chỉ thu thập lại các trận mới hoặc đã thay đổi trạng thái
+        (so với manifest của lần chạy trước), các trận khác lấy từ checkpoint.
+        """
         season_id = SEASONS.get(season)
         if not season_id:
             logger.error(f"Không tìm thấy ID cho mùa giải {season}")
-            return []
+            return
+        
+        # Checkpoint: bỏ qua các trận đã thu thập ở lần chạy trước nếu resume/incremental
+        checkpoint = CrawlCheckpoint("matches", season)
+        completed = checkpoint.open(resume or incremental)
+        
+        manifest = SeasonManifest("matches", season)
+        counts = {"total": 0, "changed": 0, "remaining": 0}
+        failed = []
+        
+        async def iter_fixtures():
+            """Các trận trong danh sách của mùa giải, lấy dần khi các trang được tải về
+            (lỗi khi tải danh sách được ném ra, không trả danh sách thiếu)"""
+            async for fixture in iter_listing(self.client, self.fixtures_url(season_id), season=season):
+                match_id = int(fixture.get("id"))
+                state = self.fixture_state(fixture)
+                counts["total"] += 1
+                if incremental and manifest.is_changed(match_id, state):
+                    completed.pop(str(match_id), None)
+                    counts["changed"] += 1
+                if str(match_id) not in completed:
+                    counts["remaining"] += 1
+                    if self.progress is not None:
+                        self.progress.add_total(1)
+                yield counts["total"], match_id, state
         
-        match_ids = self.get_season_matches(season_id)
-        matches_data = []
+        logger.info(f"Thu thập trận đấu mùa giải {season} với {self.workers} tác vụ song song")
         
-        for match_id in match_ids:
-            logger.info(f"Đang thu thập dữ liệu trận đấu {match_id}")
-            match_data = self.scrape_match(match_id, season)
+        async def scrape_one(item) -> Optional[Dict]:
+            idx, match_id, state = item
+            if str(match_id) in completed:
+                return completed.pop(str(match_id))
+            
+            logger.info(f"[{idx}] Đang thu thập dữ liệu trận đấu {match_id}")
+            try:
+                match_data = await self.scrape_match(match_id, season)
+            except RequestFailedError as e:
+                # Không ghi checkpoint để lần chạy --resume sau thu thập lại
+                logger.error(f"Bỏ qua trận đấu {match_id}: {str(e)}")
+                failed.append(match_id)
+                return None
+            finally:
+                if self.progress is not None:
+                    self.progress.advance()
             
             if match_data:
-                matches_data.append(match_data)
+                checkpoint.record(match_id, match_data)
+                manifest.update(match_id, state)
+            return match_data
+        
+        try:
+            async for match_data in ordered_map(scrape_one, iter_fixtures(), self.workers):
+                if match_data:
+                    yield match_data
+        finally:
+            manifest.save()
+        
+        if incremental:
+            logger.info(f"Cập nhật tăng dần: {counts['changed']}/{counts['total']} trận mới hoặc đã thay đổi")
+        logger.info(f"Đã thu thập {counts['remaining']}/{counts['total']} trận đấu mùa giải {season} "
+                    f"(các trận còn lại lấy từ checkpoint)")
+        if failed:
+            logger.warning(f"{len(failed)} trận đấu mùa {season} bị lỗi, chạy lại với --resume để thu thập tiếp: {failed[:20]}")
+
+    async def scrape_season_async(self, season: str, resume: bool = False,
+                                  incremental: bool = False) -> List[Dict]:
+        """Thu thập dữ liệu cho một mùa giải (nhiều trận đấu song song, giữ nguyên thứ tự)"""
+        return [match_data async for match_data in self.iter_season(season, resume, incremental)]
+
+    def scrape_season(self, season: str, resume: bool = False, incremental: bool = False) -> List[Dict]:
+        """Thu thập dữ liệu cho một mùa giải"""
+        return self.client.run(self.scrape_season_async(season, resume, incremental))
+
+    async def stream_season_jsonl(self, season: str, resume: bool = False,
+                                  incremental: bool = False) -> Optional[str]:
+        """Thu thập một mùa giải và ghi ngay từng trận vào file JSONL"""
+        output_path = get_output_path("matches", season, "jsonl")
+        
+        with JsonlWriter(output_path) as writer:
+            async for match_data in self.iter_season(season, resume, incremental):
+                writer.write(match_data)
+        
+        if writer.count == 0:
+            os.remove(output_path)
+            logger.warning(f"Không có dữ liệu để lưu cho mùa giải {season}")
+            return None
         
-        return matches_data
+        logger.info(f"Đã lưu {writer.count} trận đấu vào {output_path}")
+        return output_path
+
+    def scrape_season_jsonl(self, season: str, resume: bool = False,
+                            incremental: bool = False) -> Optional[str]:
+        """Thu thập một mùa giải ở chế độ ghi luồng JSONL (bộ nhớ không tăng theo số trận)"""
+        return self.client.run(self.stream_season_jsonl(season, resume, incremental))
 
     def save_data_json(self, data: List[Dict], season: str) -> str:
         """Lưu dữ liệu vào file JSON"""
@@ -170,6 +266,17 @@ class MatchSpider:
         logger.info(f"Đã lưu {len(data)} trận đấu vào {output_path}")
         return output_path
     
+    def save_data_parquet(self, data: List[Dict], season: str) -> str:
+        """Lưu dữ liệu vào dataset Parquet (cột có kiểu, chia phân vùng theo mùa giải)"""
+        if not data:
+            logger.warning(f"Không có dữ liệu để lưu cho mùa giải {season}")
+            return None
+        
+        output_path = write_parquet(data, os.path.join(PARQUET_DIR, "matches"))
+        
+        logger.info(f"Đã lưu {len(data)} trận đấu vào {output_path}")
+        return output_path
+    
     def save_data_csv(self, data: List[Dict], season: str) -> str:
         """Lưu dữ liệu vào file CSV"""
         if not data:
@@ -1,20 +1,24 @@
 import json
 import csv
 import logging
-import requests
-import time
-import random
 import sys
 import os
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional
 from datetime import datetime
 
 # Thêm thư mục gốc vào path để import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import (
-    API_BASE_URL, API_HEADERS, SEASONS, get_output_path, 
-    LOG_FORMAT, LOG_FILE, MIN_DELAY, MAX_DELAY
+    API_BASE_URL, SEASONS, get_output_path,
+    LOG_FORMAT, LOG_FILE, PARQUET_DIR
 )
+from utils.http_client import ApiClient
+from utils.retry import RequestFailedError
+from utils.pagination import fetch_listing
+from utils.checkpoint import CrawlCheckpoint
+from utils.jsonl import JsonlWriter
+from utils.parquet_io import write_parquet
+from utils.progress import CrawlProgress
 
 # Cấu hình logging
 logging.basicConfig(
@@ -28,30 +32,17 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class PlayerSpider:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update(API_HEADERS)
+    def __init__(self, client: ApiClient = None, progress: CrawlProgress = None):
+        self.client = client or ApiClient()
+        self.progress = progress
 
-    def get_season_players(self, season_id: str) -> List[Dict]:
+    async def get_season_players(self, season_id: str) -> List[Dict]:
         """Lấy danh sách cầu thủ của một mùa giải"""
-        url = f"{API_BASE_URL}/players?pageSize=10000&compSeasons={season_id}"
+        url = f"{API_BASE_URL}/players?compSeasons={season_id}"
         
         try:
-            # Thêm delay ngẫu nhiên
-            time.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
-            
-            response = self.session.get(url)
-            
-            # In ra thông tin chi tiết về phản hồi
-            logger.info(f"URL: {url}")
-            logger.info(f"Status code: {response.status_code}")
-            logger.info(f"Headers: {dict(response.headers)}")
-            logger.info(f"Response: {response.text[:500]}...")  # In 500 ký tự đầu tiên
-            
-            response.raise_for_status()
-            
-            data = response.json()
-            players = data.get("content", [])
+            # Đọc theo từng trang (song song), không giới hạn số cầu thủ
+            players = await fetch_listing(self.client, url)
             
             logger.info(f"Tìm thấy {len(players)} cầu thủ cho mùa giải {season_id}")
             
@@ -60,22 +51,20 @@ class PlayerSpider:
             return sorted_players
         
         except Exception as e:
+            # Không trả danh sách rỗng/thiếu: để bên gọi báo lỗi cả mùa giải
             logger.error(f"Lỗi khi lấy danh sách cầu thủ: {str(e)}")
-            return []
+            raise
 
-    def get_player_stats(self, player_id: int, season_id: str) -> Optional[Dict]:
+    async def get_player_stats(self, player_id: int, season_id: str) -> Optional[Dict]:
         """Lấy thống kê của cầu thủ trong một mùa giải"""
         url = f"{API_BASE_URL}/stats/player/{player_id}?comps=1&compSeasons={season_id}"
         
         try:
-            # Thêm delay ngẫu nhiên
-            time.sleep(random.uniform(MIN_DELAY, MAX_DELAY))
-            
-            response = self.session.get(url)
-            response.raise_for_status()
-            
-            return response.json()
+            return await self.client.get_json(url)
         
+        except RequestFailedError:
+            # Lỗi tạm thời vẫn còn sau khi thử lại: không coi là "không có dữ liệu"
+            raise
         except Exception as e:
             logger.error(f"Lỗi khi lấy thống kê cầu thủ {player_id}: {str(e)}")
             return None
@@ -120,38 +109,87 @@ class PlayerSpider:
         
         return extracted_data
 
-    def scrape_player(self, player_data: Dict, season: str, season_id: str) -> Optional[Dict]:
+    async def scrape_player(self, player_data: Dict, season: str, season_id: str) -> Optional[Dict]:
         """Thu thập dữ liệu cho một cầu thủ"""
         player_id = int(player_data.get("id", 0))
         if player_id == 0:
             return None
         
-        stats_data = self.get_player_stats(player_id, season_id)
+        stats_data = await self.get_player_stats(player_id, season_id)
         
         # Trích xuất dữ liệu quan trọng
         extracted_data = self.extract_player_data(player_data, stats_data, season)
         
         return extracted_data
 
-    def scrape_season(self, season: str) -> List[Dict]:
-        """Thu thập dữ liệu cầu thủ cho một mùa giải"""
+    async def iter_season(self, season: str, resume: bool = False) -> AsyncIterator[Dict]:
+        """Thu thập dữ liệu cầu thủ một mùa giải, trả lần lượt từng cầu thủ"""
         season_id = SEASONS.get(season)
         if not season_id:
             logger.error(f"Không tìm thấy ID cho mùa giải {season}")
-            return []
+            return
+        
+        # Checkpoint: bỏ qua các cầu thủ đã thu thập ở lần chạy trước nếu resume
+        checkpoint = CrawlCheckpoint("players", season)
+        completed = checkpoint.open(resume)
         
-        players = self.get_season_players(season_id)
-        players_data = []
+        players = await self.get_season_players(season_id)
+        failed = []
+        if self.progress is not None:
+            self.progress.add_total(sum(1 for player in players if str(player.get("id")) not in completed))
         
         for player in players:
             player_id = player.get("id")
+            if str(player_id) in completed:
+                yield completed.pop(str(player_id))
+                continue
+            
             logger.info(f"Đang thu thập dữ liệu cầu thủ {player_id}")
-            player_data = self.scrape_player(player, season, season_id)
+            try:
+                player_data = await self.scrape_player(player, season, season_id)
+            except RequestFailedError as e:
+                # Không ghi checkpoint để lần chạy --resume sau thu thập lại
+                logger.error(f"Bỏ qua cầu thủ {player_id}: {str(e)}")
+                failed.append(player_id)
+                continue
+            finally:
+                if self.progress is not None:
+                    self.progress.advance()
             
             if player_data:
-                players_data.append(player_data)
+                checkpoint.record(player_id, player_data)
+                yield player_data
         
-        return players_data
+        if failed:
+            logger.warning(f"{len(failed)} cầu thủ mùa {season} bị lỗi, chạy lại với --resume để thu thập tiếp: {failed[:20]}")
+
+    async def scrape_season_async(self, season: str, resume: bool = False) -> List[Dict]:
+        """Thu thập dữ liệu cầu thủ cho một mùa giải"""
+        return [player_data async for player_data in self.iter_season(season, resume)]
+
+    def scrape_season(self, season: str, resume: bool = False) -> List[Dict]:
+        """Thu thập dữ liệu cầu thủ cho một mùa giải"""
+        return self.client.run(self.scrape_season_async(season, resume))
+
+    async def stream_season_jsonl(self, season: str, resume: bool = False) -> Optional[str]:
+        """Thu thập một mùa giải và ghi ngay từng cầu thủ vào file JSONL"""
+        output_path = get_output_path("players", season, "jsonl")
+        
+        with JsonlWriter(output_path) as writer:
+            async for player_data in self.iter_season(season, resume):
+                writer.write(player_data)
+        
+        if writer.count == 0:
+            os.remove(output_path)
+            logger.warning(f"Không có dữ liệu để lưu cho mùa giải {season}")
+            return None
+        
+        logger.info(f"Đã lưu {writer.count} cầu thủ vào {output_path}")
+        return output_path
+
+    def scrape_season_jsonl(self, season: str, resume: bool = False) -> Optional[str]:
+        """Thu thập một mùa giải ở chế độ ghi luồng JSONL (bộ nhớ không tăng theo số cầu thủ)"""
+        return self.client.run(self.stream_season_jsonl(season, resume))
 
     def save_data_json(self, data: List[Dict], season: str) -> str:
         """Lưu dữ liệu vào file JSON"""
@@ -167,6 +205,17 @@ class PlayerSpider:
         logger.info(f"Đã lưu {len(data)} cầu thủ vào {output_path}")
         return output_path
     
+    def save_data_parquet(self, data: List[Dict], season: str) -> str:
+        """Lưu dữ liệu vào dataset Parquet (cột có kiểu, chia phân vùng theo mùa giải)"""
+        if not data:
+            logger.warning(f"Không có dữ liệu để lưu cho mùa giải {season}")
+            return None
+        
+        output_path = write_parquet(data, os.path.join(PARQUET_DIR, "players"))
+        
+        logger.info(f"Đã lưu {len(data)} cầu thủ vào {output_path}")
+        return output_path
+    
     def save_data_csv(self, data: List[Dict], season: str) -> str:
         """Lưu dữ liệu vào file CSV"""
         if not data:
@@ -0,0 +1,124 @@
+import json
+import logging
+import os
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Tên các file trong thư mục ma trận đặc trưng
+MATRIX_FILE = 'features.npy'
+LABELS_FILE = 'labels.npy'
+ROWS_FILE = 'rows.parquet'
+INDEX_FILE = 'index.json'
+
+# Cột định danh trận đấu và cột nhãn (không phải đặc trưng)
+ID_COLUMNS = ('match_id', 'season')
+LABEL_COLUMN = 'result'
+
+# Số dòng chuyển đổi mỗi lần khi ghi ma trận
+CHUNK_ROWS = 50000
+
+
+class FeatureMatrix:
+    """Ma trận đặc trưng đọc từ file .npy dạng memmap (chỉ đọc)
+
+    X và y là np.memmap: các tiến trình huấn luyện/GridSearchCV (joblib) nhận đường
+    dẫn file thay vì bản sao dữ liệu, nên mọi tiến trình dùng chung một bản trong bộ
+    nhớ đệm của hệ điều hành. Cắt theo dòng liên tục (X[:n]) vẫn là memmap.
+    """
+
+    def __init__(self, directory: str, mmap_mode: Optional[str] = 'r'):
+        self.directory = directory
+        with open(os.path.join(directory, INDEX_FILE), 'r', encoding='utf-8') as f:
+            self.index = json.load(f)
+        self.columns: List[str] = self.index['columns']
+        self.label = self.index['label']
+        self.X = np.load(os.path.join(directory, MATRIX_FILE), mmap_mode=mmap_mode)
+        labels_path = os.path.join(directory, LABELS_FILE)
+        self.y = np.load(labels_path, mmap_mode=mmap_mode) if os.path.exists(labels_path) else None
+        self._rows = None
+
+    def __len__(self) -> int:
+        return self.X.shape[0]
+
+    @property
+    def rows(self) -> pd.DataFrame:
+        """Định danh của từng dòng (match_id, season), đọc khi cần"""
+        if self._rows is None:
+            self._rows = pd.read_parquet(os.path.join(self.directory, ROWS_FILE))
+        return self._rows
+
+    def to_frame(self) -> pd.DataFrame:
+        """Chuyển về DataFrame (tạo bản sao trong bộ nhớ, chỉ dùng để xem dữ liệu)"""
+        df = pd.concat([self.rows, pd.DataFrame(np.asarray(self.X), columns=self.columns)], axis=1)
+        if self.y is not None:
+            df[self.label] = np.asarray(self.y)
+        return df
+
+
+def feature_columns(df: pd.DataFrame, exclude: Sequence[str] = ID_COLUMNS + (LABEL_COLUMN,)) -> List[str]:
+    """Các cột đặc trưng theo thứ tự trong DataFrame (bỏ cột định danh và nhãn)"""
+    return [col for col in df.columns if col not in exclude]
+
+
+def export_matrix(df: pd.DataFrame, directory: str, columns: Optional[Sequence[str]] = None,
+                  label_column: Optional[str] = LABEL_COLUMN, dtype: str = 'float32',
+                  chunk_rows: int = CHUNK_ROWS) -> FeatureMatrix:
+    """Ghi dữ liệu huấn luyện thành ma trận .npy float32 kèm file chỉ mục cột/nhãn
+
+    Thư mục đầu ra gồm:
+    - features.npy: ma trận đặc trưng (số dòng x số cột đặc trưng)
+    - labels.npy: nhãn (int8) nếu có label_column
+    - rows.parquet: match_id, season của từng dòng
+    - index.json: danh sách cột, tên nhãn và các giá trị nhãn, kiểu dữ liệu, kích thước
+
+    Ma trận được ghi thẳng vào file memmap theo từng khối chunk_rows dòng, không
+    tạo thêm bản sao toàn bộ dữ liệu trong bộ nhớ.
+
+    Returns:
+        FeatureMatrix: Ma trận vừa ghi, mở lại ở chế độ chỉ đọc
+    """
+    columns = list(columns) if columns is not None else feature_columns(df)
+    os.makedirs(directory, exist_ok=True)
+
+    n_rows = len(df)
+    matrix_path = os.path.join(directory, MATRIX_FILE)
+    matrix = np.lib.format.open_memmap(matrix_path, mode='w+', dtype=dtype, shape=(n_rows, len(columns)))
+    for start in range(0, n_rows, chunk_rows):
+        matrix[start:start + chunk_rows] = df.iloc[start:start + chunk_rows][columns].to_numpy(dtype=dtype)
+    matrix.flush()
+    del matrix
+
+    labels_path = os.path.join(directory, LABELS_FILE)
+    label_values = []
+    if label_column and label_column in df.columns:
+        labels = df[label_column].to_numpy(dtype='int8')
+        np.save(labels_path, labels)
+        label_values = sorted(int(v) for v in np.unique(labels))
+    elif os.path.exists(labels_path):
+        os.remove(labels_path)
+
+    id_columns = [col for col in ID_COLUMNS if col in df.columns]
+    df[id_columns].reset_index(drop=True).to_parquet(os.path.join(directory, ROWS_FILE), index=False)
+
+    index = {
+        'columns': columns,
+        'label': label_column if label_column in df.columns else None,
+        'label_values': label_values,
+        'id_columns': id_columns,
+        'dtype': dtype,
+        'shape': [n_rows, len(columns)],
+    }
+    with open(os.path.join(directory, INDEX_FILE), 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+
+    logger.info(f"Đã ghi ma trận đặc trưng {n_rows}x{len(columns)} ({dtype}) vào {directory}")
+    return FeatureMatrix(directory)
+
+
+def load_matrix(directory: str, mmap_mode: Optional[str] = 'r') -> FeatureMatrix:
+    """Mở ma trận đặc trưng đã ghi bằng export_matrix (mặc định memmap chỉ đọc)"""
+    return FeatureMatrix(directory, mmap_mode)
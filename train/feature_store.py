@@ -0,0 +1,214 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from config import FEATURE_STORE_DIR
+from train.features import POSITION_GROUPS, build_lineup_table, build_training_dataframe, training_columns
+from train.player_index import PlayerIndex
+
+logger = logging.getLogger(__name__)
+
+# Tăng khi cách tính đặc trưng thay đổi để bỏ toàn bộ cache cũ
+STORE_VERSION = 1
+
+# Cột của trận đấu ảnh hưởng đến đặc trưng (ngoài đội hình)
+MATCH_FINGERPRINT_COLUMNS = ['match_id', 'season', 'home_score', 'away_score']
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """Mã băm SHA-256 nội dung của một file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def inputs_digest(paths: Sequence[str]) -> str:
+    """Mã băm chung của các file đầu vào (theo thứ tự)"""
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(file_digest(path).encode('ascii'))
+    return digest.hexdigest()
+
+
+def groups_key(groups: Dict[str, Sequence[str]]) -> str:
+    """Khóa của kho đặc trưng: mã băm danh sách thuộc tính từng nhóm vị trí"""
+    payload = json.dumps({'version': STORE_VERSION, 'groups': {g: list(a) for g, a in groups.items()}})
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def _hash_frame(df: pd.DataFrame) -> np.ndarray:
+    """Mã băm uint64 của từng dòng"""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy(dtype='uint64')
+
+
+def match_fingerprints(matches_df: pd.DataFrame, player_index: PlayerIndex,
+                       groups: Dict[str, Sequence[str]] = POSITION_GROUPS) -> np.ndarray:
+    """Dấu vân tay của dữ liệu đầu vào từng trận đấu
+
+    Gồm thông tin trận đấu (MATCH_FINGERPRINT_COLUMNS) và, với từng cầu thủ đá
+    chính, vị trí trong đội hình, vị trí thi đấu và dòng dữ liệu cầu thủ (các thuộc
+    tính của mọi nhóm) được dùng cho mùa của trận đấu. Dấu vân tay chỉ thay đổi khi
+    một trong các dữ liệu này thay đổi.
+
+    Returns:
+        np.ndarray: Mảng uint64, mỗi trận đấu một giá trị (theo thứ tự matches_df)
+    """
+    matches_df = matches_df.reset_index(drop=True)
+    match_cols = [col for col in MATCH_FINGERPRINT_COLUMNS if col in matches_df.columns]
+    fingerprints = _hash_frame(matches_df[match_cols].astype(str))
+
+    # Mã băm của từng dòng dữ liệu cầu thủ, chỉ trên các cột được dùng làm đặc trưng
+    attributes = sorted({attr for attrs in groups.values() for attr in attrs})
+    player_hashes = _hash_frame(pd.DataFrame(player_index.attribute_matrix(attributes)))
+
+    lineup = build_lineup_table(matches_df, player_index)
+    rows = player_index.rows(lineup['player_id'].to_numpy(), lineup['season'].to_numpy())
+    row_hashes = np.zeros(len(rows), dtype='uint64')
+    row_hashes[rows >= 0] = player_hashes[rows[rows >= 0]]
+    entries = pd.DataFrame({
+        'side': lineup['side'].to_numpy(),
+        'slot': lineup['slot'].to_numpy(),
+        'player_id': lineup['player_id'].to_numpy(),
+        'position': lineup['position'].astype(str).to_numpy(),
+        'row_hash': row_hashes,
+    })
+    # Cộng dồn (tràn số uint64 là chủ ý) mã băm các cầu thủ vào trận đấu tương ứng
+    np.add.at(fingerprints, lineup['match_row'].to_numpy(), _hash_frame(entries))
+    return fingerprints
+
+
+class FeatureStore:
+    """Kho lưu đặc trưng huấn luyện đã tính cho từng trận đấu
+
+    Mỗi bộ thuộc tính (groups) có một thư mục riêng theo khóa groups_key, gồm:
+    - features.parquet: đặc trưng của các trận đấu hợp lệ (cột theo training_columns)
+    - fingerprints.parquet: match_id -> dấu vân tay đầu vào của mọi trận đấu đã tính
+    - manifest.json: mã băm file đầu vào, danh sách thuộc tính, số trận đấu
+
+    Khi tạo lại, chỉ các trận đấu mới hoặc có dấu vân tay thay đổi mới được tính
+    lại; nếu mã băm các file đầu vào không đổi thì dữ liệu được đọc thẳng từ kho.
+    """
+
+    def __init__(self, root: str = FEATURE_STORE_DIR, groups: Optional[Dict[str, Sequence[str]]] = None):
+        self.groups = groups or POSITION_GROUPS
+        self.key = groups_key(self.groups)
+        self.directory = os.path.join(root, self.key)
+        self.features_path = os.path.join(self.directory, 'features.parquet')
+        self.fingerprints_path = os.path.join(self.directory, 'fingerprints.parquet')
+        self.manifest_path = os.path.join(self.directory, 'manifest.json')
+
+    def _load_manifest(self) -> Dict:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Không đọc được manifest {self.manifest_path}, coi như chưa có: {str(e)}")
+            return {}
+
+    def load(self) -> Optional[pd.DataFrame]:
+        """Đọc đặc trưng đã lưu (None nếu kho chưa có dữ liệu)"""
+        if not (os.path.exists(self.features_path) and os.path.exists(self.manifest_path)):
+            return None
+        try:
+            return pd.read_parquet(self.features_path)
+        except Exception as e:
+            logger.warning(f"Không đọc được kho đặc trưng {self.features_path}: {str(e)}")
+            return None
+
+    def _load_fingerprints(self) -> pd.Series:
+        if not os.path.exists(self.fingerprints_path):
+            return pd.Series(dtype='uint64')
+        try:
+            stored = pd.read_parquet(self.fingerprints_path)
+            return pd.Series(stored['fingerprint'].to_numpy(dtype='uint64'), index=stored['match_id'].to_numpy())
+        except Exception as e:
+            logger.warning(f"Không đọc được dấu vân tay {self.fingerprints_path}: {str(e)}")
+            return pd.Series(dtype='uint64')
+
+    def _save(self, features: pd.DataFrame, match_ids: np.ndarray, fingerprints: np.ndarray,
+              input_digest: Optional[str]) -> None:
+        """Ghi kho đặc trưng (ghi file tạm rồi thay thế để tránh hỏng file)"""
+        os.makedirs(self.directory, exist_ok=True)
+        outputs = [
+            (self.features_path, lambda path: features.to_parquet(path, index=False)),
+            (self.fingerprints_path, lambda path: pd.DataFrame(
+                {'match_id': match_ids, 'fingerprint': fingerprints}).to_parquet(path, index=False)),
+        ]
+        for path, write in outputs:
+            write(path + '.tmp')
+            os.replace(path + '.tmp', path)
+
+        manifest = {
+            'version': STORE_VERSION,
+            'inputs_digest': input_digest,
+            'groups': {group: list(attrs) for group, attrs in self.groups.items()},
+            'matches': int(len(match_ids)),
+            'rows': int(len(features)),
+        }
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def build(self, matches_df: pd.DataFrame, players: Union[PlayerIndex, pd.DataFrame],
+              input_files: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """Lấy đặc trưng huấn luyện, chỉ tính lại các trận đấu có đầu vào thay đổi
+
+        Args:
+            matches_df: Dữ liệu trận đấu (như build_training_dataframe)
+            players: PlayerIndex hoặc DataFrame cầu thủ
+            input_files: Các file đã dùng để tạo matches_df/players (tùy chọn). Nếu mã
+                băm không đổi so với lần lưu trước, đặc trưng được đọc thẳng từ kho mà
+                không cần tính dấu vân tay
+
+        Returns:
+            pd.DataFrame: Đặc trưng theo thứ tự trận đấu trong matches_df
+        """
+        input_digest = inputs_digest(input_files) if input_files else None
+        if input_digest and self._load_manifest().get('inputs_digest') == input_digest:
+            cached = self.load()
+            if cached is not None:
+                logger.info(f"Đầu vào không đổi, đọc {len(cached)} dòng đặc trưng từ {self.features_path}")
+                return cached
+
+        player_index = players if isinstance(players, PlayerIndex) else PlayerIndex(players)
+        matches_df = matches_df.reset_index(drop=True)
+        match_ids = matches_df['match_id'].to_numpy()
+        if matches_df['match_id'].duplicated().any():
+            logger.warning("match_id bị trùng lặp, tính lại toàn bộ đặc trưng và không lưu vào kho")
+            return build_training_dataframe(matches_df, player_index, self.groups)
+
+        fingerprints = match_fingerprints(matches_df, player_index, self.groups)
+        stored = self._load_fingerprints()
+        cached = self.load() if len(stored) else None
+        if cached is None or list(cached.columns) != training_columns(self.groups):
+            cached, stored = None, pd.Series(dtype='uint64')
+
+        known = pd.Index(match_ids).isin(stored.index)
+        unchanged = known.copy()
+        unchanged[known] = stored.reindex(match_ids[known]).to_numpy(dtype='uint64') == fingerprints[known]
+        stale = ~unchanged
+
+        logger.info(f"Kho đặc trưng: {int(unchanged.sum())} trận đấu dùng lại, {int(stale.sum())} trận đấu cần tính lại")
+        fresh = build_training_dataframe(matches_df[stale], player_index, self.groups)
+        if cached is not None:
+            kept = cached[cached['match_id'].isin(match_ids[unchanged])]
+            features = pd.concat([kept, fresh], ignore_index=True) if len(fresh) else kept
+        else:
+            features = fresh
+
+        # Sắp xếp theo thứ tự trận đấu trong matches_df
+        order = pd.Index(match_ids).get_indexer(features['match_id'].to_numpy())
+        features = features.iloc[np.argsort(order, kind='stable')].reset_index(drop=True)
+
+        self._save(features, match_ids, fingerprints, input_digest)
+        return features
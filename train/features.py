@@ -0,0 +1,188 @@
+import re
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from train.player_index import PlayerIndex
+
+# Thuộc tính cho từng nhóm vị trí (giống notebook huấn luyện)
+GK_ATTRIBUTES = [
+    'saves', 'penalty_faced', 'penalty_save', 'goals_conceded',
+    'accurate_goal_kicks', 'goal_kicks', 'diving_save', 'punches',
+    'stand_save', 'good_high_claim', 'accurate_keeper_sweeper', 'keeper_throws'
+]
+BACK_ATTRIBUTES = [
+    'clearance_off_line', 'effective_clearance', 'effective_head_clearance',
+    'head_clearance', 'interception', 'interception_won',
+    'interceptions_in_box', 'last_man_tackle', 'duel_won', 'duel_lost',
+    'challenge_lost', 'blocked_cross', 'blocked_pass',
+    'blocked_scoring_att', 'times_tackled', 'won_tackle'
+]
+MID_ATTRIBUTES = [
+    'fwd_pass', 'backward_pass', 'open_play_pass', 'total_pass', 'accurate_pass',
+    'ball_recovery', 'duel_won', 'poss_won_mid_3rd', 'poss_won_def_3rd',
+    'poss_lost_all', 'poss_lost_ctrl', 'interception', 'successful_fifty_fifty',
+    'assist_pass_lost', 'assist_attempt_saved', 'put_through',
+    'successful_put_through', 'total_final_third_passes', 'successful_final_third_passes'
+]
+FORWARD_ATTRIBUTES = [
+    'goal_assist', 'goal_assist_openplay', 'att_openplay', 'att_ibox_goal',
+    'att_ibox_target', 'att_ibox_miss', 'att_obox_goal', 'att_obox_target',
+    'ontarget_scoring_att', 'hit_woodwork', 'big_chance_created',
+    'big_chance_scored', 'big_chance_missed', 'goal_fastbreak',
+    'att_fastbreak', 'shot_fastbreak', 'total_scoring_att', 'att_miss_high',
+    'att_goal_low_left', 'att_goal_low_right'
+]
+
+# Nhóm vị trí -> thuộc tính; thứ tự nhóm là thứ tự cột đầu ra
+POSITION_GROUPS = {
+    'G': GK_ATTRIBUTES,
+    'B': BACK_ATTRIBUTES,
+    'M': MID_ATTRIBUTES,
+    'F': FORWARD_ATTRIBUTES,
+}
+
+# Nhóm chỉ lấy cầu thủ đầu tiên trong đội hình thay vì trung bình (thủ môn)
+FIRST_PLAYER_GROUPS = ('G',)
+
+SIDES = ('home', 'away')
+
+STARTING_COLUMN_PATTERN = re.compile(r'^(home|away)_starting_(\d+)_(player_id|name)$')
+
+
+def training_columns(groups: Dict[str, Sequence[str]] = POSITION_GROUPS) -> List[str]:
+    """Danh sách cột của dữ liệu huấn luyện (giống football_training_data.csv)"""
+    columns = ['match_id', 'season']
+    for side in SIDES:
+        for group, attributes in groups.items():
+            columns += [f"{side}_{group}_{attr}" for attr in attributes]
+    columns.append('result')
+    return columns
+
+
+def starting_columns(matches_df: pd.DataFrame, side: str) -> List[str]:
+    """Các cột đội hình đá chính của một đội theo thứ tự vị trí 1..11
+
+    Ưu tiên cột *_player_id; nếu không có thì dùng cột *_name (dữ liệu cũ đã được
+    chuyển tên thành player_id nhưng giữ tên cột).
+    """
+    found = {}
+    for col in matches_df.columns:
+        match = STARTING_COLUMN_PATTERN.match(col)
+        if match and match.group(1) == side:
+            found.setdefault(match.group(3), []).append((int(match.group(2)), col))
+    slots = found.get('player_id') or found.get('name') or []
+    return [col for _, col in sorted(slots)]
+
+
+def build_lineup_table(matches_df: pd.DataFrame, player_index: PlayerIndex) -> pd.DataFrame:
+    """Bảng đội hình dạng dài: mỗi dòng là một cầu thủ đá chính của một đội trong một trận
+
+    Cột: match_row (vị trí dòng trong matches_df), side (0 = home, 1 = away), slot,
+    player_id, season, position
+    """
+    frames = []
+    for side_code, side in enumerate(SIDES):
+        columns = starting_columns(matches_df, side)
+        ids = matches_df[columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype='float64')
+        n_matches, n_slots = ids.shape
+        frames.append(pd.DataFrame({
+            'match_row': np.repeat(np.arange(n_matches), n_slots),
+            'side': side_code,
+            'slot': np.tile(np.arange(n_slots), n_matches),
+            'player_id': ids.ravel(),
+        }))
+    lineup = pd.concat(frames, ignore_index=True)
+    lineup = lineup[lineup['player_id'].notna()].reset_index(drop=True)
+    lineup['season'] = matches_df['season'].to_numpy(dtype=object)[lineup['match_row'].to_numpy()]
+    lineup['position'] = player_index.positions(lineup['player_id'].to_numpy())
+    return lineup
+
+
+def _group_mean(keys: np.ndarray, values: np.ndarray, n_keys: int) -> np.ndarray:
+    """Trung bình theo nhóm (giá trị NaN làm kết quả của nhóm thành NaN, như statistics.mean)"""
+    order = np.argsort(keys, kind='stable')
+    keys, values = keys[order], values[order]
+    result = np.full((n_keys, values.shape[1]), np.nan)
+    if len(keys) == 0:
+        return result
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    sums = np.add.reduceat(values, starts, axis=0)
+    counts = np.diff(np.r_[starts, len(keys)])
+    result[keys[starts]] = sums / counts[:, None]
+    return result
+
+
+def match_results(matches_df: pd.DataFrame) -> np.ndarray:
+    """Kết quả trận đấu: 0 = đội nhà thắng, 1 = hòa, 2 = đội khách thắng"""
+    home = pd.to_numeric(matches_df['home_score'], errors='coerce').to_numpy(dtype='float64')
+    away = pd.to_numeric(matches_df['away_score'], errors='coerce').to_numpy(dtype='float64')
+    return np.select([home > away, home == away], [0, 1], default=2)
+
+
+def build_training_dataframe(matches_df: pd.DataFrame,
+                             players: Union[PlayerIndex, pd.DataFrame],
+                             groups: Optional[Dict[str, Sequence[str]]] = None) -> pd.DataFrame:
+    """Tạo dữ liệu huấn luyện cho tất cả trận đấu cùng lúc
+
+    Với mỗi đội trong mỗi trận, cầu thủ đá chính được chia theo nhóm vị trí
+    (G/B/M/F); thuộc tính của nhóm là trung bình của các cầu thủ trong nhóm (thủ
+    môn chỉ lấy người đầu tiên). Dữ liệu cầu thủ lấy theo mùa của trận đấu, nếu
+    không có thì mùa gần nhất trước đó, không tìm thấy thì bằng 0. Trận đấu mà một
+    đội thiếu cầu thủ ở bất kỳ nhóm vị trí nào sẽ bị bỏ qua.
+
+    Toàn bộ phép tính chạy trên bảng đội hình dạng dài bằng NumPy/pandas, nên thời
+    gian tăng tuyến tính theo số trận đấu.
+
+    Args:
+        matches_df: Dữ liệu trận đấu (match_id, season, home_score, away_score và
+            các cột đội hình đá chính)
+        players: PlayerIndex hoặc DataFrame cầu thủ (player_id, season, position, ...)
+        groups: Nhóm vị trí -> danh sách thuộc tính (mặc định POSITION_GROUPS)
+
+    Returns:
+        pd.DataFrame: Các cột theo training_columns(groups)
+    """
+    groups = groups or POSITION_GROUPS
+    player_index = players if isinstance(players, PlayerIndex) else PlayerIndex(players)
+    matches_df = matches_df.reset_index(drop=True)
+    n_matches = len(matches_df)
+
+    lineup = build_lineup_table(matches_df, player_index)
+    lineup = lineup[lineup['position'].isin(list(groups))]
+    # Khóa của một đội trong một trận
+    team_keys = lineup['match_row'].to_numpy() * 2 + lineup['side'].to_numpy()
+
+    # Trận đấu hợp lệ: cả hai đội đều có ít nhất một cầu thủ ở mỗi nhóm vị trí
+    valid = np.ones(n_matches, dtype=bool)
+    for group in groups:
+        in_group = (lineup['position'] == group).to_numpy()
+        has_group = np.zeros(n_matches * 2, dtype=bool)
+        has_group[team_keys[in_group]] = True
+        valid &= has_group.reshape(n_matches, 2).all(axis=1)
+
+    blocks = [
+        pd.DataFrame({'match_id': matches_df['match_id'].to_numpy(),
+                      'season': matches_df['season'].to_numpy()})
+    ]
+    features = {side: [] for side in SIDES}
+    for group, attributes in groups.items():
+        members = lineup[(lineup['position'] == group).to_numpy()]
+        if group in FIRST_PLAYER_GROUPS:
+            members = members.sort_values(['match_row', 'side', 'slot'], kind='stable')
+            members = members.drop_duplicates(subset=['match_row', 'side'], keep='first')
+        keys = members['match_row'].to_numpy() * 2 + members['side'].to_numpy()
+        values = player_index.values(members['player_id'].to_numpy(), members['season'].to_numpy(), attributes)
+        means = _group_mean(keys, values, n_matches * 2).reshape(n_matches, 2, len(attributes))
+        for side_code, side in enumerate(SIDES):
+            features[side].append(pd.DataFrame(
+                means[:, side_code, :], columns=[f"{side}_{group}_{attr}" for attr in attributes]
+            ))
+
+    for side in SIDES:
+        blocks.extend(features[side])
+    blocks.append(pd.DataFrame({'result': match_results(matches_df)}))
+
+    result = pd.concat(blocks, axis=1)
+    return result[valid].reset_index(drop=True)
@@ -0,0 +1,128 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class PlayerIndex:
+    """Chỉ mục tra cứu dữ liệu cầu thủ theo (player_id, season)
+
+    Thay cho việc lọc `players_df.loc[players_df["player_id"] == id]` cho từng cầu
+    thủ của từng trận: bảng (player_id x season) -> vị trí dòng được tính trước một
+    lần, kèm quy tắc "mùa gần nhất tại hoặc trước mùa cần tìm" (nếu mùa đó không có
+    dữ liệu thì dùng mùa trước đó). Mỗi lần tra cứu chỉ còn là truy cập mảng.
+
+    Quy ước giống notebook huấn luyện:
+    - Mỗi (player_id, season) dùng dòng xuất hiện đầu tiên
+    - Vị trí của cầu thủ lấy từ dòng đầu tiên của cầu thủ đó (bất kể mùa)
+    - Thuộc tính không có trong dữ liệu nhận giá trị 0
+    """
+
+    def __init__(self, players_df: pd.DataFrame, id_col: str = 'player_id',
+                 season_col: str = 'season', position_col: str = 'position'):
+        frame = players_df.copy()
+        frame[id_col] = pd.to_numeric(frame[id_col], errors='coerce')
+        frame = frame.dropna(subset=[id_col, season_col]).reset_index(drop=True)
+        frame[id_col] = frame[id_col].astype('int64')
+
+        self.frame = frame
+        self.id_col = id_col
+        self.season_col = season_col
+        self.position_col = position_col
+        # Tên mùa giải dạng "2023-2024" nên thứ tự chuỗi cũng là thứ tự thời gian
+        self.seasons = np.array(sorted(frame[season_col].unique()), dtype=object)
+
+        # Bảng player_id x season -> vị trí dòng, điền tiếp từ mùa trước cho các mùa thiếu
+        rows = frame[[id_col, season_col]].assign(_row=np.arange(len(frame)))
+        rows = rows.drop_duplicates(subset=[id_col, season_col], keep='first')
+        table = rows.pivot(index=id_col, columns=season_col, values='_row')
+        table = table.reindex(columns=self.seasons).ffill(axis=1)
+        self._player_ids = pd.Index(table.index.to_numpy(dtype='int64'))
+        self._rows = table.fillna(-1).to_numpy().astype('int64')
+
+        # Vị trí thi đấu theo cùng thứ tự với self._player_ids
+        if position_col in frame.columns:
+            first_rows = frame.drop_duplicates(subset=[id_col], keep='first').set_index(id_col)
+            self._positions = first_rows[position_col].reindex(self._player_ids).to_numpy(dtype=object)
+        else:
+            self._positions = np.full(len(self._player_ids), None, dtype=object)
+        self._matrices: Dict[Tuple[str, ...], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._player_ids)
+
+    def _player_positions(self, player_ids: Iterable) -> np.ndarray:
+        """Vị trí của player_id trong chỉ mục (-1 nếu không có hoặc không hợp lệ)"""
+        ids = np.asarray(player_ids, dtype=object).ravel()
+        ids = pd.to_numeric(pd.Series(ids), errors='coerce').to_numpy(dtype='float64')
+        result = np.full(len(ids), -1, dtype='int64')
+        valid = ~np.isnan(ids)
+        if valid.any():
+            result[valid] = self._player_ids.get_indexer(ids[valid].astype('int64'))
+        return result
+
+    def _season_positions(self, seasons) -> np.ndarray:
+        """Chỉ số mùa gần nhất tại hoặc trước từng mùa (-1 nếu không có mùa nào)"""
+        seasons = np.asarray(seasons, dtype=object)
+        if seasons.ndim == 0:
+            seasons = np.full(1, seasons.item(), dtype=object)
+        return np.searchsorted(self.seasons, seasons, side='right') - 1
+
+    def rows(self, player_ids: Iterable, seasons) -> np.ndarray:
+        """Vị trí dòng dữ liệu cho từng cặp (player_id, season), -1 nếu không tìm thấy
+
+        Args:
+            player_ids: Danh sách player_id (có thể là float hoặc NaN)
+            seasons: Mùa giải tương ứng từng cầu thủ, hoặc một mùa chung cho tất cả
+        """
+        player_pos = self._player_positions(player_ids)
+        season_pos = np.broadcast_to(self._season_positions(seasons), player_pos.shape)
+        result = np.full(player_pos.shape, -1, dtype='int64')
+        ok = (player_pos >= 0) & (season_pos >= 0)
+        result[ok] = self._rows[player_pos[ok], season_pos[ok]]
+        return result
+
+    def row(self, player_id, season: str) -> int:
+        """Vị trí dòng dữ liệu của một cầu thủ trong một mùa (-1 nếu không tìm thấy)"""
+        return int(self.rows([player_id], season)[0])
+
+    def get(self, player_id, season: str) -> Optional[pd.Series]:
+        """Dữ liệu của cầu thủ ở mùa gần nhất tại hoặc trước `season`"""
+        row = self.row(player_id, season)
+        return self.frame.iloc[row] if row >= 0 else None
+
+    def positions(self, player_ids: Iterable) -> np.ndarray:
+        """Vị trí thi đấu của từng cầu thủ (None nếu không tìm thấy)"""
+        player_pos = self._player_positions(player_ids)
+        result = np.full(len(player_pos), None, dtype=object)
+        found = player_pos >= 0
+        result[found] = self._positions[player_pos[found]]
+        return result
+
+    def position(self, player_id) -> Optional[str]:
+        """Vị trí thi đấu của một cầu thủ (None nếu không tìm thấy)"""
+        return self.positions([player_id])[0]
+
+    def attribute_matrix(self, attributes: Sequence[str]) -> np.ndarray:
+        """Ma trận giá trị thuộc tính (số dòng x số thuộc tính), cột không có nhận giá trị 0"""
+        key = tuple(attributes)
+        if key not in self._matrices:
+            matrix = np.zeros((len(self.frame), len(attributes)), dtype='float64')
+            for i, attr in enumerate(attributes):
+                if attr in self.frame.columns:
+                    matrix[:, i] = pd.to_numeric(self.frame[attr], errors='coerce').to_numpy(dtype='float64')
+            self._matrices[key] = matrix
+        return self._matrices[key]
+
+    def values(self, player_ids: Iterable, seasons, attributes: Sequence[str]) -> np.ndarray:
+        """Giá trị thuộc tính của từng cầu thủ (mỗi cầu thủ một dòng, không tìm thấy = 0)"""
+        rows = self.rows(player_ids, seasons)
+        matrix = self.attribute_matrix(attributes)
+        result = np.zeros((len(rows), len(attributes)), dtype='float64')
+        found = rows >= 0
+        result[found] = matrix[rows[found]]
+        return result
+
+    def known_seasons(self) -> List[str]:
+        """Danh sách mùa giải có trong dữ liệu (theo thứ tự thời gian)"""
+        return list(self.seasons)
@@ -0,0 +1,324 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn import __version__ as sklearn_version
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+
+from config import SEARCH_CACHE_PATH
+
+logger = logging.getLogger(__name__)
+
+# Số dòng đọc mỗi lần khi tính mã băm dữ liệu
+DIGEST_CHUNK_ROWS = 100000
+
+
+class SearchCache:
+    """Cache điểm đánh giá của từng (mô hình, tham số, dữ liệu, fold, số mẫu) trên đĩa (SQLite)"""
+
+    def __init__(self, path: str = SEARCH_CACHE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS fold_scores (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                params TEXT,
+                fold INTEGER,
+                n_resources INTEGER,
+                score REAL NOT NULL,
+                fit_time REAL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, Tuple[float, float]]:
+        """Đọc điểm đã lưu: key -> (score, fit_time)"""
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = list(keys[start:start + 500])
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, score, fit_time FROM fold_scores WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                found.update({key: (score, fit_time) for key, score, fit_time in rows})
+        return found
+
+    def set_many(self, records: Iterable[Tuple]) -> None:
+        """Ghi điểm: mỗi bản ghi là (key, model, params, fold, n_resources, score, fit_time)"""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO fold_scores "
+                "(key, model, params, fold, n_resources, score, fit_time, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [record + (now,) for record in records]
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Đóng kết nối SQLite"""
+        with self._lock:
+            self._conn.close()
+
+
+class SearchResult:
+    """Kết quả tinh chỉnh tham số của một mô hình"""
+
+    def __init__(self, name: str, results: pd.DataFrame, best_params: Dict[str, Any],
+                 best_score: float, best_estimator=None):
+        self.name = name
+        self.results = results
+        self.best_params = best_params
+        self.best_score = best_score
+        self.best_estimator = best_estimator
+
+
+def data_digest(X, y) -> str:
+    """Mã băm nội dung dữ liệu huấn luyện (đọc theo từng khối, dùng được với memmap)"""
+    X = np.asarray(X)
+    y = np.asarray(y)
+    digest = hashlib.sha256(f"{X.shape}{X.dtype}{y.shape}{y.dtype}".encode('ascii'))
+    for start in range(0, X.shape[0], DIGEST_CHUNK_ROWS):
+        digest.update(np.ascontiguousarray(X[start:start + DIGEST_CHUNK_ROWS]).tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    return digest.hexdigest()
+
+
+def _param_value(value) -> str:
+    # Mô hình lồng nhau (ví dụ SVC trong OneVsRestClassifier) được biểu diễn bằng tên lớp,
+    # tham số của chúng đã có trong get_params(deep=True)
+    if hasattr(value, 'get_params'):
+        return f"{type(value).__module__}.{type(value).__name__}"
+    return repr(value)
+
+
+def estimator_signature(estimator) -> str:
+    """Chuỗi đại diện cho lớp mô hình và toàn bộ tham số gốc"""
+    params = estimator.get_params(deep=True)
+    payload = {
+        'class': _param_value(estimator),
+        'params': {key: _param_value(value) for key, value in sorted(params.items())},
+        'sklearn': sklearn_version,
+    }
+    return json.dumps(payload, sort_keys=True)
+
+
+def fold_key(signature: str, params: Dict[str, Any], data_key: str, cv_key: str,
+             fold: int, n_resources: int) -> str:
+    """Khóa cache của một lần đánh giá (mô hình, tham số, dữ liệu, cách chia fold, fold, số mẫu)"""
+    payload = json.dumps({
+        'estimator': signature,
+        'params': {key: _param_value(value) for key, value in sorted(params.items())},
+        'data': data_key,
+        'cv': cv_key,
+        'fold': fold,
+        'n_resources': n_resources,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def halving_schedule(n_candidates: int, max_resources: int, min_resources: int,
+                     factor: int) -> List[Tuple[int, int]]:
+    """Lịch loại dần (successive halving): danh sách (số ứng viên, số mẫu huấn luyện) mỗi vòng
+
+    Mỗi vòng giữ lại 1/factor ứng viên tốt nhất và tăng số mẫu lên factor lần; vòng
+    cuối luôn dùng toàn bộ dữ liệu của fold.
+    """
+    required = 1 + int(math.floor(math.log(max(n_candidates, 1), factor)))
+    possible = 1 + int(math.floor(math.log(max(max_resources / max(min_resources, 1), 1), factor)))
+    n_iterations = max(1, min(required, possible))
+
+    schedule = []
+    candidates = n_candidates
+    for i in range(n_iterations):
+        resources = max_resources // factor ** (n_iterations - 1 - i)
+        schedule.append((candidates, resources))
+        candidates = max(1, math.ceil(candidates / factor))
+    return schedule
+
+
+def _subsample(train_idx: np.ndarray, n_resources: int, sample_rank: np.ndarray) -> np.ndarray:
+    """Lấy n_resources mẫu của fold theo thứ tự ngẫu nhiên cố định sample_rank"""
+    if n_resources >= len(train_idx):
+        return train_idx
+    return np.sort(train_idx[np.argsort(sample_rank[train_idx], kind='stable')[:n_resources]])
+
+
+def _evaluate(estimator, params: Dict[str, Any], X, y, train_idx: np.ndarray,
+              test_idx: np.ndarray, scoring: str) -> Tuple[float, float, Optional[str]]:
+    """Huấn luyện trên một fold và chấm điểm trên phần kiểm tra: (score, fit_time, lỗi)"""
+    try:
+        model = clone(estimator).set_params(**params)
+        start = time.time()
+        model.fit(X[train_idx], y[train_idx])
+        fit_time = time.time() - start
+        return float(get_scorer(scoring)(model, X[test_idx], y[test_idx])), fit_time, None
+    except Exception as e:
+        return float('nan'), 0.0, str(e)
+
+
+def _refit(estimator, params: Dict[str, Any], X, y):
+    return clone(estimator).set_params(**params).fit(X, y)
+
+
+def run_search(searches: Dict[str, Tuple[Any, Dict[str, List]]], X, y, cv: int = 5,
+               scoring: str = 'accuracy', halving: bool = False, factor: int = 3,
+               min_resources: Optional[int] = None, n_jobs: int = -1,
+               cache: Optional[SearchCache] = None, refit: bool = True,
+               random_state: int = 42) -> Dict[str, SearchResult]:
+    """Tinh chỉnh tham số cho nhiều mô hình cùng lúc, có cache kết quả từng fold
+
+    Mọi (mô hình, tham số, fold) chưa có trong cache của tất cả mô hình được gom
+    chung và chạy song song bằng joblib trên toàn bộ CPU. Điểm của từng fold được
+    lưu theo mã băm của mô hình, tham số, dữ liệu và cách chia fold, nên lần chạy
+    sau chỉ đánh giá các cấu hình mới hoặc khi dữ liệu thay đổi.
+
+    Chia fold giống GridSearchCV với bộ phân loại (StratifiedKFold không xáo trộn).
+    Khi halving=True, các ứng viên được đánh giá trên tập con ngày càng lớn của từng
+    fold và mỗi vòng chỉ giữ lại 1/factor ứng viên tốt nhất.
+
+    Args:
+        searches: Tên mô hình -> (mô hình gốc, lưới tham số như GridSearchCV)
+        X, y: Dữ liệu huấn luyện (có thể là np.memmap)
+        cv: Số fold
+        scoring: Tên hàm chấm điểm của scikit-learn
+        halving: Bật loại dần ứng viên (successive halving)
+        factor: Tỉ lệ loại ứng viên / tăng số mẫu mỗi vòng
+        min_resources: Số mẫu huấn luyện ở vòng đầu (mặc định 2 * số lớp * cv)
+        n_jobs: Số tiến trình song song (-1 = tất cả CPU)
+        cache: Cache điểm đánh giá (mặc định SearchCache tại SEARCH_CACHE_PATH)
+        refit: Huấn luyện lại mô hình tốt nhất trên toàn bộ dữ liệu
+        random_state: Seed chọn tập con mẫu khi halving
+
+    Returns:
+        Dict[str, SearchResult]: Kết quả theo tên mô hình
+    """
+    X = X if isinstance(X, np.ndarray) else np.asarray(X)
+    y = np.asarray(y)
+    cache = cache or SearchCache()
+    data_key = data_digest(X, y)
+    cv_key = f"stratified:{cv}"
+
+    folds = list(StratifiedKFold(n_splits=cv).split(np.zeros(len(y)), y))
+    # Thứ tự ngẫu nhiên cố định để lấy tập con của mỗi fold (tập con vòng sau chứa tập con vòng trước)
+    sample_rank = np.random.RandomState(random_state).permutation(len(y))
+    max_resources = min(len(train_idx) for train_idx, _ in folds)
+    if min_resources is None:
+        min_resources = 2 * len(np.unique(y)) * cv
+
+    state = {}
+    for name, (estimator, param_grid) in searches.items():
+        candidates = list(ParameterGrid(param_grid))
+        schedule = (halving_schedule(len(candidates), max_resources, min_resources, factor)
+                    if halving else [(len(candidates), max_resources)])
+        state[name] = {
+            'estimator': estimator,
+            'signature': estimator_signature(estimator),
+            'candidates': candidates,
+            'schedule': schedule,
+            'rows': [],
+        }
+
+    n_rounds = max(len(s['schedule']) for s in state.values())
+    for iteration in range(n_rounds):
+        # Gom các lần đánh giá của mọi mô hình trong vòng này
+        tasks = []
+        for name, s in state.items():
+            if iteration >= len(s['schedule']):
+                continue
+            _, n_resources = s['schedule'][iteration]
+            for candidate_id, params in enumerate(s['candidates']):
+                for fold, (train_idx, test_idx) in enumerate(folds):
+                    key = fold_key(s['signature'], params, data_key, cv_key, fold, n_resources)
+                    tasks.append((name, candidate_id, fold, n_resources, key))
+
+        cached = cache.get_many([task[-1] for task in tasks])
+        pending = [task for task in tasks if task[-1] not in cached]
+        logger.info(f"Vòng {iteration + 1}/{n_rounds}: {len(tasks)} lần đánh giá, "
+                    f"{len(tasks) - len(pending)} lấy từ cache, {len(pending)} cần chạy")
+
+        outputs = Parallel(n_jobs=n_jobs)(
+            delayed(_evaluate)(
+                state[name]['estimator'], state[name]['candidates'][candidate_id], X, y,
+                _subsample(folds[fold][0], n_resources, sample_rank), folds[fold][1], scoring
+            )
+            for name, candidate_id, fold, n_resources, _ in pending
+        )
+
+        records = []
+        for (name, candidate_id, fold, n_resources, key), (score, fit_time, error) in zip(pending, outputs):
+            if error is not None:
+                logger.warning(f"{name} {state[name]['candidates'][candidate_id]} fold {fold} lỗi: {error}")
+                continue
+            cached[key] = (score, fit_time)
+            records.append((key, name, json.dumps(state[name]['candidates'][candidate_id], default=_param_value),
+                            fold, n_resources, score, fit_time))
+        cache.set_many(records)
+
+        # Tổng hợp điểm theo ứng viên, giữ lại 1/factor ứng viên tốt nhất cho vòng sau
+        for name, s in state.items():
+            if iteration >= len(s['schedule']):
+                continue
+            _, n_resources = s['schedule'][iteration]
+            rows = []
+            for candidate_id, params in enumerate(s['candidates']):
+                keys = [fold_key(s['signature'], params, data_key, cv_key, fold, n_resources)
+                        for fold in range(len(folds))]
+                scores = np.array([cached[key][0] if key in cached else np.nan for key in keys])
+                fit_times = np.array([cached[key][1] if key in cached else np.nan for key in keys])
+                rows.append({
+                    'model': name,
+                    'iteration': iteration,
+                    'n_resources': n_resources,
+                    'n_candidates': len(s['candidates']),
+                    'params': params,
+                    'mean_score': scores.mean(),
+                    'std_score': scores.std(),
+                    'mean_fit_time': np.nanmean(fit_times) if not np.isnan(fit_times).all() else np.nan,
+                })
+            s['rows'].extend(rows)
+
+            if iteration + 1 < len(s['schedule']):
+                keep = s['schedule'][iteration + 1][0]
+                scores = np.array([row['mean_score'] for row in rows])
+                order = np.argsort(-np.nan_to_num(scores, nan=-np.inf), kind='stable')[:keep]
+                s['candidates'] = [s['candidates'][i] for i in sorted(order)]
+
+    results = {}
+    for name, s in state.items():
+        table = pd.DataFrame(s['rows'])
+        last = table[table['iteration'] == table['iteration'].max()].reset_index(drop=True)
+        best = int(np.argmax(np.nan_to_num(last['mean_score'].to_numpy(), nan=-np.inf)))
+        results[name] = SearchResult(name, table, last.loc[best, 'params'], float(last.loc[best, 'mean_score']))
+
+    if refit:
+        estimators = Parallel(n_jobs=n_jobs)(
+            delayed(_refit)(state[name]['estimator'], result.best_params, X, y)
+            for name, result in results.items()
+        )
+        for result, estimator in zip(results.values(), estimators):
+            result.best_estimator = estimator
+
+    for name, result in results.items():
+        logger.info(f"{name}: tham số tốt nhất {result.best_params}, điểm {result.best_score:.4f}")
+    return results
@@ -0,0 +1,49 @@
+import asyncio
+from collections import deque
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, TypeVar, Union
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def ordered_map(func: Callable[[T], Awaitable[R]], items: Union[Iterable[T], AsyncIterable[T]],
+                      concurrency: int, window: int = None) -> AsyncIterator[R]:
+    """Chạy func(item) song song và trả kết quả theo đúng thứ tự của items
+
+    - Tối đa `concurrency` lời gọi func chạy cùng lúc
+    - Tối đa `window` tác vụ được tạo trước (mặc định 4 x concurrency), nên bộ nhớ
+      không phụ thuộc vào số lượng items
+    - items có thể là async iterator (ví dụ danh sách phân trang đang tải): item
+      được lấy dần khi cần, lỗi khi lấy item được ném ra cho bên gọi
+    """
+    concurrency = max(1, concurrency)
+    window = max(concurrency, window or concurrency * 4)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(item: T) -> R:
+        async with semaphore:
+            return await func(item)
+
+    is_async = hasattr(items, "__aiter__")
+    iterator = items.__aiter__() if is_async else iter(items)
+    pending = deque()
+
+    async def schedule_next() -> None:
+        try:
+            item = await iterator.__anext__() if is_async else next(iterator)
+        except (StopIteration, StopAsyncIteration):
+            return
+        pending.append(asyncio.ensure_future(run(item)))
+
+    try:
+        for _ in range(window):
+            await schedule_next()
+
+        while pending:
+            result = await pending.popleft()
+            await schedule_next()
+            yield result
+    finally:
+        # Hủy các tác vụ còn lại nếu vòng lặp bị dừng giữa chừng
+        for task in pending:
+            task.cancel()
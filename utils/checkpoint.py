@@ -0,0 +1,67 @@
+import logging
+import os
+import sys
+from typing import Dict
+
+# Thêm thư mục gốc vào path để import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import CHECKPOINT_DIR
+from utils.jsonl import JsonlWriter, iter_jsonl
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlCheckpoint:
+    """Lưu tiến trình thu thập của một mùa giải để có thể chạy tiếp sau khi bị gián đoạn
+
+    Mỗi bản ghi hoàn thành được ghi ngay thành một dòng JSON
+    {"key": ..., "data": ...} và flush xuống đĩa, nên khi tiến trình dừng giữa
+    chừng chỉ mất tối đa bản ghi đang ghi dở.
+    """
+
+    def __init__(self, kind: str, season: str, directory: str = CHECKPOINT_DIR):
+        self.kind = kind
+        self.season = season
+        self.path = os.path.join(directory, f"{kind}_{season.replace('-', '_')}.jsonl")
+        os.makedirs(directory, exist_ok=True)
+
+    def load(self) -> Dict[str, Dict]:
+        """Đọc các bản ghi đã hoàn thành (key -> data), bản ghi sau ghi đè bản ghi trước"""
+        completed = {}
+        if not os.path.exists(self.path):
+            return completed
+
+        # Dòng cuối có thể bị ghi dở khi tiến trình dừng đột ngột
+        for entry in iter_jsonl(self.path, skip_invalid=True):
+            completed[str(entry["key"])] = entry["data"]
+
+        logger.info(f"Đã đọc {len(completed)} {self.kind} hoàn thành từ checkpoint {self.path}")
+        return completed
+
+    def record(self, key, data: Dict) -> None:
+        """Ghi nhận một bản ghi vừa hoàn thành"""
+        with JsonlWriter(self.path, append=True) as writer:
+            writer.write({"key": str(key), "data": data})
+
+    def reset(self) -> None:
+        """Xóa checkpoint cũ để bắt đầu thu thập lại từ đầu"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def compact(self, completed: Dict[str, Dict]) -> None:
+        """Ghi lại checkpoint chỉ gồm các bản ghi hợp lệ (loại bỏ dòng ghi dở, bản ghi trùng)"""
+        tmp_path = self.path + ".tmp"
+        with JsonlWriter(tmp_path) as writer:
+            for key, data in completed.items():
+                writer.write({"key": key, "data": data})
+        os.replace(tmp_path, self.path)
+
+    def open(self, resume: bool) -> Dict[str, Dict]:
+        """Chuẩn bị checkpoint cho một lần chạy: đọc lại nếu resume, ngược lại xóa"""
+        if resume:
+            completed = self.load()
+            # Ghi lại file để các dòng mới không nối vào một dòng bị ghi dở
+            self.compact(completed)
+            return completed
+        self.reset()
+        return {}
@@ -0,0 +1,143 @@
+import csv
+import logging
+import os
+from itertools import islice
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Số dòng đọc/ghi mỗi lần khi sao chép dữ liệu
+CHUNK_ROWS = 10000
+
+
+def read_header(path: str) -> List[str]:
+    """Đọc dòng tiêu đề của file CSV"""
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(f), [])
+
+
+def union_headers(headers: Sequence[Sequence[str]]) -> List[str]:
+    """Hợp các tiêu đề, giữ thứ tự xuất hiện đầu tiên (giống pd.concat)"""
+    columns = []
+    seen = set()
+    for header in headers:
+        for column in header:
+            if column not in seen:
+                seen.add(column)
+                columns.append(column)
+    return columns
+
+
+def merge_csv_streaming(input_files: Sequence[str], output_file: str,
+                        source_column: Optional[str] = None,
+                        chunk_rows: int = CHUNK_ROWS, strict: bool = False) -> Dict[str, int]:
+    """Gộp nhiều file CSV theo chiều dọc mà không nạp toàn bộ dữ liệu vào bộ nhớ
+
+    Bước 1 chỉ đọc dòng tiêu đề của từng file để lấy hợp các cột. Bước 2 sao chép
+    lần lượt từng khối `chunk_rows` dòng sang file đầu ra, cột thiếu để trống.
+    Giá trị được giữ nguyên dạng văn bản như trong file gốc.
+
+    File đầu vào bị lỗi (tiêu đề hoặc nội dung) được bỏ qua; nếu lỗi xảy ra giữa lúc
+    sao chép thì gộp lại từ đầu không có file đó, để các cột chỉ file đó có không
+    xuất hiện trong kết quả. Với strict=True, lỗi được ném ra và output_file giữ
+    nguyên. Kết quả được ghi vào file tạm, chỉ thay thế output_file khi gộp xong.
+
+    Args:
+        input_files: Các file CSV đầu vào (theo thứ tự ghép)
+        output_file: File CSV đầu ra
+        source_column: Tên cột ghi tên file nguồn (chỉ điền cho file chưa có cột này)
+        chunk_rows: Số dòng mỗi lần sao chép
+        strict: Ném lỗi thay vì bỏ qua file đầu vào bị lỗi
+
+    Returns:
+        Dict[str, int]: Số dòng đã ghi của từng file đầu vào
+    """
+    headers = {}
+    for path in input_files:
+        try:
+            headers[path] = read_header(path)
+        except Exception as e:
+            if strict:
+                raise
+            logger.warning(f"Lỗi khi đọc tiêu đề file {path}, bỏ qua: {str(e)}")
+
+    output_dir = os.path.dirname(output_file)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    # Ghi vào file tạm rồi thay thế, tránh để lại file kết quả dở dang
+    tmp_path = output_file + '.tmp'
+    try:
+        while True:
+            counts, failed = _write_merged(headers, tmp_path, source_column, chunk_rows, strict)
+            if failed is None:
+                break
+            # File lỗi giữa chừng: gộp lại không có file đó (tiêu đề chung không còn cột của nó)
+            del headers[failed]
+
+        os.replace(tmp_path, output_file)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return counts
+
+
+def _write_merged(headers: Dict[str, List[str]], tmp_path: str, source_column: Optional[str],
+                  chunk_rows: int, strict: bool):
+    """Ghi các file theo thứ tự vào tmp_path; dừng ở file đầu tiên bị lỗi
+
+    Returns:
+        (số dòng của từng file, file bị lỗi hoặc None nếu không có lỗi)
+    """
+    def output_header(header: List[str]) -> List[str]:
+        if source_column and source_column not in header:
+            return header + [source_column]
+        return header
+
+    fieldnames = union_headers(output_header(header) for header in headers.values())
+    positions = {column: i for i, column in enumerate(fieldnames)}
+
+    counts = {}
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as out:
+        writer = csv.writer(out)
+        writer.writerow(fieldnames)
+
+        for path, header in headers.items():
+            try:
+                counts[path] = _copy_rows(path, header, writer, fieldnames, positions,
+                                          source_column, chunk_rows)
+            except Exception as e:
+                if strict:
+                    raise
+                logger.warning(f"Lỗi khi đọc file {path}, bỏ qua: {str(e)}")
+                return counts, path
+            logger.info(f"Đã ghép {counts[path]} dòng từ {path}")
+
+    return counts, None
+
+
+def _copy_rows(path: str, header: List[str], writer, fieldnames: List[str], positions: Dict[str, int],
+               source_column: Optional[str], chunk_rows: int) -> int:
+    """Sao chép các dòng của một file CSV sang writer theo thứ tự cột chung, trả về số dòng"""
+    index_map = [positions[column] for column in header]
+    out_row_template = [''] * len(fieldnames)
+    if source_column and source_column not in header:
+        out_row_template[positions[source_column]] = os.path.basename(path)
+
+    count = 0
+    with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        while True:
+            chunk = list(islice(reader, chunk_rows))
+            if not chunk:
+                break
+            rows = []
+            for row in chunk:
+                out_row = out_row_template.copy()
+                for value, position in zip(row, index_map):
+                    out_row[position] = value
+                rows.append(out_row)
+            writer.writerows(rows)
+            count += len(rows)
+    return count
@@ -0,0 +1,139 @@
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Thêm thư mục gốc vào path để import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    HTTP_CACHE_PATH, HTTP_CACHE_TTL, HTTP_CACHE_DEFAULT_TTL, CURRENT_SEASON, SEASONS
+)
+
+# Phân loại endpoint theo đường dẫn (thứ tự quan trọng: mẫu cụ thể đứng trước)
+ENDPOINT_PATTERNS = [
+    ("fixtures", re.compile(r"/fixtures/?$")),
+    ("fixture", re.compile(r"/fixtures/\d+$")),
+    ("match_stats", re.compile(r"/stats/match/\d+$")),
+    ("player_match_stats", re.compile(r"/players/match-stats$")),
+    ("players", re.compile(r"/players/?$")),
+    ("player", re.compile(r"/players/\d+$")),
+    ("player_stats", re.compile(r"/stats/player/\d+$")),
+]
+
+# Tra ngược ID mùa giải -> tên mùa giải
+SEASON_BY_ID = {str(season_id): season for season, season_id in SEASONS.items()}
+
+
+class CacheMissError(Exception):
+    """Không có dữ liệu trong cache khi chạy ở chế độ offline"""
+
+
+def normalize_url(url: str) -> str:
+    """Chuẩn hóa URL làm khóa cache (sắp xếp tham số query)"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+
+
+def endpoint_name(url: str) -> Optional[str]:
+    """Xác định loại endpoint của một URL API"""
+    path = urlsplit(url).path
+    for name, pattern in ENDPOINT_PATTERNS:
+        if pattern.search(path):
+            return name
+    return None
+
+
+def season_from_url(url: str) -> Optional[str]:
+    """Lấy tên mùa giải từ tham số compSeasons/compSeason của URL (nếu có)"""
+    params = dict(parse_qsl(urlsplit(url).query))
+    season_id = params.get("compSeasons") or params.get("compSeason")
+    return SEASON_BY_ID.get(str(season_id)) if season_id else None
+
+
+def get_cache_ttl(url: str, season: str = None) -> Optional[float]:
+    """Thời gian sống (giây) của cache cho một URL, None = không bao giờ hết hạn
+
+    Dữ liệu của các mùa giải đã kết thúc không thay đổi nên được giữ vĩnh viễn;
+    mùa giải hiện tại (hoặc không xác định được mùa) dùng TTL theo endpoint.
+    """
+    season = season or season_from_url(url)
+    if season and season != CURRENT_SEASON:
+        return None
+    return HTTP_CACHE_TTL.get(endpoint_name(url), HTTP_CACHE_DEFAULT_TTL)
+
+
+class ResponseCache:
+    """Cache phản hồi API trên đĩa (SQLite), khóa theo URL và query string"""
+
+    def __init__(self, path: str = HTTP_CACHE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                endpoint TEXT,
+                fetched_at REAL NOT NULL,
+                body TEXT
+            )"""
+        )
+        self._conn.commit()
+
+    def get(self, url: str, ttl: Optional[float] = None) -> Tuple[bool, Any]:
+        """Đọc phản hồi từ cache
+
+        Returns:
+            (hit, data): hit = False nếu không có hoặc đã hết hạn theo ttl
+            (ttl None = không kiểm tra hạn)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fetched_at, body FROM responses WHERE url = ?", (normalize_url(url),)
+            ).fetchone()
+
+        if row is None:
+            return False, None
+
+        fetched_at, body = row
+        if ttl is not None and time.time() - fetched_at > ttl:
+            return False, None
+
+        return True, json.loads(body) if body is not None else None
+
+    def set(self, url: str, data: Any) -> None:
+        """Ghi phản hồi vào cache (data None = API trả 204 không có dữ liệu)"""
+        body = json.dumps(data, ensure_ascii=False) if data is not None else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, endpoint, fetched_at, body) VALUES (?, ?, ?, ?)",
+                (normalize_url(url), endpoint_name(url), time.time(), body)
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Đóng kết nối SQLite"""
+        with self._lock:
+            self._conn.close()
+
+
+# Cache dùng chung cho toàn bộ tiến trình
+_shared_cache: Optional[ResponseCache] = None
+
+
+def get_shared_cache() -> ResponseCache:
+    """Lấy cache dùng chung (mở file SQLite ở lần gọi đầu tiên)"""
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ResponseCache()
+    return _shared_cache
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import sys
+import os
+from typing import Dict, Optional
+
+import aiohttp
+
+# Thêm thư mục gốc vào path để import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    API_HEADERS, MAX_IN_FLIGHT_REQUESTS, HTTP_KEEPALIVE_TIMEOUT,
+    HTTP_CACHE_ENABLED, HTTP_CACHE_OFFLINE, get_random_headers
+)
+from utils.rate_limiter import TokenBucket, get_shared_limiter, parse_retry_after
+from utils.retry import RetryPolicy, CircuitBreaker, RequestFailedError, get_shared_breaker
+from utils.http_cache import ResponseCache, CacheMissError, get_shared_cache, get_cache_ttl
+
+logger = logging.getLogger(__name__)
+
+
+class ApiClient:
+    """Client HTTP bất đồng bộ dùng chung cho tất cả các spider
+
+    - Một aiohttp.ClientSession duy nhất: connection pooling và keep-alive
+    - Semaphore giới hạn số request đang chờ phản hồi (in-flight)
+    - Token bucket (mặc định dùng chung cả tiến trình) giới hạn số request/giây,
+      tự giảm tốc và gửi lại khi API trả 429/503
+    - Timeout cho từng request; lỗi tạm thời (timeout, mất kết nối, 5xx) được gửi
+      lại với backoff có jitter theo RetryPolicy
+    - Circuit breaker (mặc định dùng chung) tạm dừng mọi request khi API liên tục lỗi
+    - Cache phản hồi trên đĩa với TTL theo endpoint/mùa giải; chế độ offline
+      chỉ đọc từ cache
+    """
+
+    # Mã trạng thái cho biết API đang quá tải
+    THROTTLE_STATUSES = (429, 503)
+
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT_REQUESTS,
+                 rate_limiter: TokenBucket = None, rotate_user_agent: bool = False,
+                 use_cache: bool = HTTP_CACHE_ENABLED, offline: bool = HTTP_CACHE_OFFLINE,
+                 cache: ResponseCache = None, retry_policy: RetryPolicy = None,
+                 breaker: CircuitBreaker = None):
+        self.max_in_flight = max(1, max_in_flight)
+        self.rate_limiter = rate_limiter or get_shared_limiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breaker = breaker or get_shared_breaker()
+        self.offline = offline
+        self.cache = (cache or get_shared_cache()) if (use_cache or offline) else None
+        self.rotate_user_agent = rotate_user_agent
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def open(self) -> None:
+        """Mở session (phải gọi bên trong vòng lặp sự kiện đang chạy)"""
+        if self._session is not None:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.max_in_flight,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT
+        )
+        self._session = aiohttp.ClientSession(headers=API_HEADERS, connector=connector)
+        self._semaphore = asyncio.Semaphore(self.max_in_flight)
+
+    async def close(self) -> None:
+        """Đóng session và giải phóng các kết nối"""
+        if self._session is not None:
+            await self._session.close()
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self) -> "ApiClient":
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def run(self, coro):
+        """Chạy một coroutine từ code đồng bộ, mở session trong suốt thời gian chạy"""
+        async def runner():
+            async with self:
+                return await coro
+        return asyncio.run(runner())
+
+    async def get_json(self, url: str, log_response: bool = False, season: str = None) -> Optional[Dict]:
+        """Gửi GET request và trả về JSON (ưu tiên đọc từ cache)
+
+        Trả về None nếu API trả 204 (không có dữ liệu). Lỗi tạm thời vẫn còn sau
+        khi đã thử lại hết số lần được ném ra dưới dạng RequestFailedError; các lỗi
+        HTTP khác (404...) được ném ra dưới dạng aiohttp.ClientResponseError để
+        spider tự xử lý.
+        `season` giúp xác định TTL cache khi URL không chứa ID mùa giải.
+        """
+        if self.cache is not None:
+            # Chế độ offline dùng mọi bản ghi trong cache, bỏ qua TTL
+            ttl = None if self.offline else get_cache_ttl(url, season)
+            hit, data = self.cache.get(url, ttl)
+            if hit:
+                return data
+
+        if self.offline:
+            raise CacheMissError(f"Không có dữ liệu trong cache cho {url}")
+
+        data = await self._fetch_json(url, log_response)
+
+        if self.cache is not None:
+            self.cache.set(url, data)
+
+        return data
+
+    async def _fetch_json(self, url: str, log_response: bool) -> Optional[Dict]:
+        """Gửi GET request thật tới API"""
+        if self._session is None:
+            raise RuntimeError("ApiClient chưa được mở, hãy dùng 'async with client' hoặc client.run()")
+
+        policy = self.retry_policy
+        attempt = 0
+        while True:
+            await self.breaker.acquire()
+            await self.rate_limiter.acquire()
+            headers = get_random_headers() if self.rotate_user_agent else None
+
+            try:
+                async with self._semaphore:
+                    async with self._session.get(url, headers=headers, timeout=policy.timeout) as response:
+                        if log_response:
+                            text = await response.text()
+                            # In ra thông tin chi tiết về phản hồi
+                            logger.info(f"URL: {url}")
+                            logger.info(f"Status code: {response.status}")
+                            logger.info(f"Headers: {dict(response.headers)}")
+                            logger.info(f"Response: {text[:500]}...")  # In 500 ký tự đầu tiên
+
+                        if response.status in self.THROTTLE_STATUSES and attempt < policy.max_retries:
+                            # API quá tải: giảm tốc độ chung rồi gửi lại
+                            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                            self.rate_limiter.on_throttled(retry_after)
+                            attempt += 1
+                            logger.warning(
+                                f"API trả {response.status} cho {url}, giảm tốc độ còn "
+                                f"{self.rate_limiter.rate:.2f} request/giây (thử lại {attempt}/{policy.max_retries})"
+                            )
+                            continue
+
+                        response.raise_for_status()
+                        data = None if response.status == 204 else await response.json(content_type=None)
+
+            except Exception as e:
+                if not policy.is_retryable(e):
+                    if isinstance(e, aiohttp.ClientResponseError):
+                        # API vẫn phản hồi (404...), không tính là API bị lỗi
+                        self.breaker.record_success()
+                    raise
+
+                self.breaker.record_failure()
+                if attempt >= policy.max_retries:
+                    raise RequestFailedError(
+                        f"{url} vẫn lỗi sau {attempt + 1} lần gửi: {type(e).__name__} {str(e)}"
+                    ) from e
+
+                attempt += 1
+                delay = policy.backoff(attempt)
+                logger.warning(
+                    f"Lỗi khi gửi request {url}: {type(e).__name__} {str(e)}, "
+                    f"thử lại sau {delay:.1f} giây ({attempt}/{policy.max_retries})"
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            self.rate_limiter.on_success()
+            self.breaker.record_success()
+            return data
@@ -0,0 +1,84 @@
+import json
+import os
+from typing import Any, Iterator
+
+from utils.jsonl import iter_jsonl
+
+# Kích thước mỗi lần đọc file (ký tự)
+CHUNK_SIZE = 1 << 20
+
+
+def _first_char(path: str) -> str:
+    """Ký tự khác khoảng trắng đầu tiên của file ('' nếu file rỗng)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(4096)
+            if not chunk:
+                return ''
+            stripped = chunk.lstrip()
+            if stripped:
+                return stripped[0]
+
+
+def iter_json_array(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Đọc lần lượt từng phần tử của một mảng JSON lớn mà không nạp cả file vào bộ nhớ
+
+    File được đọc theo từng khối và giải mã từng phần tử bằng
+    JSONDecoder.raw_decode, nên bộ nhớ chỉ phụ thuộc vào kích thước một phần tử.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = f.read(chunk_size).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f"File {path} không phải mảng JSON")
+        pos = 1
+        eof = False
+
+        while True:
+            # Bỏ qua khoảng trắng và dấu phẩy giữa các phần tử
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+
+            try:
+                if pos >= len(buffer):
+                    raise json.JSONDecodeError("Hết dữ liệu trong bộ đệm", buffer, pos)
+                item, end = decoder.raw_decode(buffer, pos)
+                # Phần tử nằm sát cuối bộ đệm có thể chưa đầy đủ (ví dụ số bị cắt đôi)
+                if end == len(buffer) and not eof:
+                    raise json.JSONDecodeError("Phần tử có thể chưa đầy đủ", buffer, pos)
+                # raw_decode dừng ở ký tự không thuộc phần tử: với số bị cắt ở dấu chấm
+                # hoặc số mũ ('5.' + '5', '1e' + '3') phần đã giải mã chỉ là một phần
+                if end < len(buffer) and buffer[end] not in ' \t\r\n,]':
+                    raise json.JSONDecodeError("Phần tử chưa kết thúc", buffer, end)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+
+            yield item
+            pos = end
+
+
+def iter_json_records(path: str) -> Iterator[Any]:
+    """Đọc lần lượt từng bản ghi của file JSON (mảng) hoặc JSON Lines
+
+    Định dạng được nhận diện theo ký tự đầu tiên của file: '[' là mảng JSON,
+    ngược lại mỗi dòng là một bản ghi JSON.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+
+    first = _first_char(path)
+    if not first:
+        return
+    if first == '[':
+        yield from iter_json_array(path)
+    else:
+        yield from iter_jsonl(path)
@@ -0,0 +1,62 @@
+import json
+import logging
+import os
+from typing import Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class JsonlWriter:
+    """Ghi dữ liệu dạng JSON Lines: mỗi bản ghi một dòng, flush ngay sau khi ghi
+
+    Bộ nhớ không tăng theo số bản ghi và dữ liệu đã ghi vẫn còn nguyên nếu
+    tiến trình bị dừng giữa chừng.
+    """
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        self.append = append
+        self.count = 0
+        self._file = None
+
+    def __enter__(self) -> "JsonlWriter":
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, 'a' if self.append else 'w', encoding='utf-8')
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def write(self, record: Dict) -> None:
+        """Ghi một bản ghi"""
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.count += 1
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def iter_jsonl(path: str, skip_invalid: bool = False) -> Iterator[Dict]:
+    """Đọc lần lượt từng bản ghi của file JSON Lines
+
+    Args:
+        path (str): Đường dẫn file .jsonl
+        skip_invalid (bool): Bỏ qua (thay vì báo lỗi) các dòng không phải JSON hợp lệ,
+            ví dụ dòng cuối bị ghi dở khi tiến trình dừng đột ngột
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                if not skip_invalid:
+                    raise
+                logger.warning(f"Bỏ qua dòng JSON lỗi {path}:{line_no}")
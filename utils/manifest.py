@@ -0,0 +1,56 @@
+import json
+import logging
+import os
+import sys
+from typing import Dict, Set
+
+# Thêm thư mục gốc vào path để import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import MANIFEST_DIR
+
+logger = logging.getLogger(__name__)
+
+
+class SeasonManifest:
+    """Trạng thái đã biết của từng bản ghi trong một mùa giải (dùng cho cập nhật tăng dần)
+
+    File manifest lưu key -> trạng thái (ví dụ trạng thái trận đấu, giờ thi đấu,
+    tỉ số) tại thời điểm bản ghi được thu thập. So sánh với danh sách mới nhất từ
+    API cho biết bản ghi nào mới hoặc đã thay đổi và cần thu thập lại.
+    """
+
+    def __init__(self, kind: str, season: str, directory: str = MANIFEST_DIR):
+        self.kind = kind
+        self.season = season
+        self.path = os.path.join(directory, f"{kind}_{season.replace('-', '_')}.json")
+        os.makedirs(directory, exist_ok=True)
+        self.states: Dict[str, Dict] = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning(f"Không đọc được manifest {self.path}, coi như chưa có: {str(e)}")
+            return {}
+
+    def is_changed(self, key, state: Dict) -> bool:
+        """Bản ghi mới hoặc có trạng thái khác với lần thu thập trước"""
+        return self.states.get(str(key)) != state
+
+    def diff(self, latest: Dict[str, Dict]) -> Set[str]:
+        """Trả về các key mới hoặc có trạng thái khác với lần thu thập trước"""
+        return {key for key, state in latest.items() if self.is_changed(key, state)}
+
+    def update(self, key, state: Dict) -> None:
+        """Ghi nhận trạng thái của một bản ghi vừa thu thập xong"""
+        self.states[str(key)] = state
+
+    def save(self) -> None:
+        """Lưu manifest (ghi file tạm rồi thay thế để tránh hỏng file)"""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.states, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
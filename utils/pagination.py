@@ -0,0 +1,79 @@
+import logging
+import math
+import os
+import sys
+from typing import AsyncIterator, Dict, List
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Thêm thư mục gốc vào path để import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import LISTING_PAGE_SIZE, LISTING_PAGE_CONCURRENCY
+from utils.async_pipeline import ordered_map
+
+logger = logging.getLogger(__name__)
+
+
+def page_url(url: str, page: int, page_size: int) -> str:
+    """URL của một trang (thay thế tham số page/pageSize nếu đã có)"""
+    parts = urlsplit(url)
+    params = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+              if key not in ("page", "pageSize")]
+    params += [("page", str(page)), ("pageSize", str(page_size))]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(params), parts.fragment))
+
+
+async def fetch_page(client, url: str, page: int, page_size: int = LISTING_PAGE_SIZE,
+                     season: str = None) -> Dict:
+    """Tải một trang của danh sách (lỗi tạm thời được ApiClient tự gửi lại)"""
+    return await client.get_json(page_url(url, page, page_size), season=season) or {}
+
+
+async def iter_listing(client, url: str, page_size: int = LISTING_PAGE_SIZE,
+                       concurrency: int = LISTING_PAGE_CONCURRENCY, season: str = None) -> AsyncIterator[Dict]:
+    """Đọc toàn bộ một danh sách phân trang của API (trường content + pageInfo), trả lần lượt từng bản ghi
+
+    Trang đầu cho biết tổng số trang (pageInfo.numPages); các trang còn lại được tải
+    song song (tối đa `concurrency` trang cùng lúc) và trả về theo đúng thứ tự trang.
+    Mỗi trang là một request riêng nên lỗi tạm thời chỉ gửi lại trang đó; nếu vẫn
+    lỗi sau khi đã thử lại thì ném lỗi thay vì trả về danh sách thiếu.
+    """
+    first = await fetch_page(client, url, 0, page_size, season)
+    content = first.get("content") or []
+    page_info = first.get("pageInfo") or {}
+    num_entries = page_info.get("numEntries")
+
+    num_pages = page_info.get("numPages")
+    if num_pages is None and num_entries is not None:
+        num_pages = math.ceil(num_entries / page_size)
+
+    count = len(content)
+    for item in content:
+        yield item
+
+    if num_pages is not None:
+        async def load(page: int) -> List[Dict]:
+            data = await fetch_page(client, url, page, page_size, season)
+            return data.get("content") or []
+
+        async for page_content in ordered_map(load, range(1, num_pages), concurrency):
+            count += len(page_content)
+            for item in page_content:
+                yield item
+    else:
+        # API không trả pageInfo: đọc lần lượt đến khi gặp trang thiếu
+        page = 0
+        while len(content) >= page_size:
+            page += 1
+            data = await fetch_page(client, url, page, page_size, season)
+            content = data.get("content") or []
+            count += len(content)
+            for item in content:
+                yield item
+
+    if num_entries is not None and count != num_entries:
+        logger.warning(f"Danh sách {url} có {count}/{num_entries} bản ghi (dữ liệu thay đổi trong lúc tải?)")
+
+
+async def fetch_listing(client, url: str, **kwargs) -> List[Dict]:
+    """Đọc toàn bộ danh sách phân trang vào một list (tham số như iter_listing)"""
+    return [item async for item in iter_listing(client, url, **kwargs)]
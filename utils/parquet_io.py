@@ -0,0 +1,176 @@
+import json
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import pandas as pd
+
+from utils.csv_merge import read_header
+
+# Các cột dùng để chia thư mục (partition) khi ghi Parquet
+DEFAULT_PARTITION_COLS = ('season',)
+
+# Các kiểu thử khi suy ra kiểu cột của file CSV (hẹp -> rộng), không khớp thì giữ dạng chuỗi
+CSV_TYPE_CANDIDATES = ('int64', 'double', 'bool')
+
+
+def _require_pyarrow():
+    """Import pyarrow (thư viện bắt buộc để đọc/ghi Parquet)"""
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Cần cài đặt pyarrow để dùng định dạng Parquet: pip install pyarrow") from e
+    return pq
+
+
+def coerce_types(df: pd.DataFrame) -> pd.DataFrame:
+    """Chuyển các cột về kiểu dữ liệu phù hợp thay vì để dạng chuỗi/object
+
+    - Cột chứa dict/list (ví dụ teams, stats của trận đấu) được mã hóa thành chuỗi JSON
+    - Cột object mà mọi giá trị khác rỗng đều là số được chuyển thành cột số
+    """
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype != object:
+            continue
+
+        non_null = df[col].dropna()
+        if non_null.empty:
+            continue
+
+        if non_null.map(lambda v: isinstance(v, (dict, list))).any():
+            df[col] = df[col].map(
+                lambda v: json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list)) else v
+            )
+            continue
+
+        converted = pd.to_numeric(df[col], errors='coerce')
+        if converted.notna().sum() == len(non_null):
+            df[col] = converted
+
+    return df
+
+
+def write_parquet(data: Union[pd.DataFrame, Iterable[Dict]], output_path: str,
+                  partition_cols: Optional[Sequence[str]] = DEFAULT_PARTITION_COLS) -> str:
+    """Ghi dữ liệu ra Parquet với kiểu cột đã chuẩn hóa
+
+    Nếu dữ liệu có các cột partition (mặc định: season), output_path là thư mục
+    dataset dạng `season=2023-2024/...`; ghi lại một mùa sẽ thay thế đúng phân
+    vùng của mùa đó. Ngược lại output_path là một file .parquet.
+
+    Returns:
+        str: Đường dẫn file/thư mục đã ghi
+    """
+    pq = _require_pyarrow()
+    import pyarrow as pa
+
+    df = data if isinstance(data, pd.DataFrame) else pd.DataFrame(list(data))
+    df = coerce_types(df)
+
+    partition_cols = [col for col in (partition_cols or []) if col in df.columns]
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    if partition_cols:
+        os.makedirs(output_path, exist_ok=True)
+        pq.write_to_dataset(
+            table, root_path=output_path, partition_cols=partition_cols,
+            existing_data_behavior='delete_matching'
+        )
+    else:
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        pq.write_table(table, output_path)
+
+    return output_path
+
+
+def _open_csv_as_strings(csv_path: str, columns: Sequence[str]):
+    """Mở file CSV để đọc theo từng khối, mọi cột dạng chuỗi (ô trống là null)"""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    convert_options = pa_csv.ConvertOptions(
+        column_types={column: pa.string() for column in columns},
+        strings_can_be_null=True
+    )
+    return pa_csv.open_csv(csv_path, convert_options=convert_options)
+
+
+def _try_cast(values, target_type):
+    """Chuyển mảng chuỗi sang target_type, trả về None nếu có giá trị không chuyển được"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    try:
+        return pc.cast(values, target_type)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return None
+
+
+def infer_csv_schema(csv_path: str):
+    """Suy ra kiểu từng cột của file CSV bằng cách đọc lần lượt từng khối
+
+    Mỗi cột giữ kiểu hẹp nhất (int64, float64, bool) mà mọi giá trị khác rỗng đều
+    chuyển được; cột toàn giá trị rỗng là float64 (giống pd.read_csv), còn lại là chuỗi.
+    """
+    import pyarrow as pa
+
+    columns = read_header(csv_path)
+    candidates = {column: list(CSV_TYPE_CANDIDATES) for column in columns}
+    has_values = set()
+
+    for batch in _open_csv_as_strings(csv_path, columns):
+        for column, array in zip(batch.schema.names, batch.columns):
+            values = array.drop_null()
+            if len(values) == 0:
+                continue
+            has_values.add(column)
+            candidates[column] = [alias for alias in candidates[column]
+                                  if _try_cast(values, pa.type_for_alias(alias)) is not None]
+
+    fields = []
+    for column in columns:
+        if column not in has_values:
+            fields.append(pa.field(column, pa.float64()))
+        elif candidates[column]:
+            fields.append(pa.field(column, pa.type_for_alias(candidates[column][0])))
+        else:
+            fields.append(pa.field(column, pa.string()))
+    return pa.schema(fields)
+
+
+def csv_to_parquet(csv_path: str, output_path: str) -> str:
+    """Chuyển một file CSV sang Parquet theo từng khối, bộ nhớ không tăng theo kích thước file
+
+    Lần đọc thứ nhất suy ra kiểu cột trên toàn bộ file (infer_csv_schema), lần thứ
+    hai chuyển từng khối sang kiểu đó và ghi nối tiếp bằng ParquetWriter.
+    """
+    pq = _require_pyarrow()
+    import pyarrow as pa
+
+    schema = infer_csv_schema(csv_path)
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with pq.ParquetWriter(output_path, schema) as writer:
+        for batch in _open_csv_as_strings(csv_path, schema.names):
+            arrays = [_try_cast(array, field.type) for array, field in zip(batch.columns, schema)]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+
+    return output_path
+
+
+def is_parquet_path(path: str) -> bool:
+    """Kiểm tra đường dẫn có phải file/thư mục Parquet không"""
+    return path.endswith('.parquet') or os.path.isdir(path)
+
+
+def read_table(path: str, columns: Optional[List[str]] = None, **kwargs) -> pd.DataFrame:
+    """Đọc bảng dữ liệu từ Parquet (chỉ các cột cần thiết) hoặc CSV"""
+    if is_parquet_path(path):
+        _require_pyarrow()
+        return pd.read_parquet(path, columns=columns, **kwargs)
+    return pd.read_csv(path, usecols=columns, **kwargs)
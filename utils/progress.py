@@ -0,0 +1,69 @@
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Khoảng thời gian tối thiểu giữa hai lần in tiến độ (giây)
+REPORT_INTERVAL = 10
+
+
+class CrawlProgress:
+    """Tiến độ chung của nhiều lượt thu thập chạy song song (mỗi lượt là một cặp loại dữ liệu + mùa giải)
+
+    Spider gọi add_total() khi biết số bản ghi cần thu thập của một mùa giải và
+    advance() sau mỗi bản ghi (kể cả bản ghi lỗi). Bản ghi lấy lại từ checkpoint
+    không được tính, nên tốc độ và thời gian còn lại (ETA) chỉ dựa trên request thật.
+    ETA được tính theo số bản ghi đã biết; các lượt chưa lấy danh sách chưa được tính vào.
+    """
+
+    def __init__(self, units: int = 0, interval: float = REPORT_INTERVAL):
+        self.units = units
+        self.interval = interval
+        self.units_done = 0
+        self.total = 0
+        self.done = 0
+        self.started = time.monotonic()
+        self._last_report = self.started
+
+    def add_total(self, count: int) -> None:
+        """Thêm số bản ghi cần thu thập của một lượt"""
+        self.total += count
+
+    def advance(self, count: int = 1) -> None:
+        """Ghi nhận các bản ghi vừa xử lý xong, in tiến độ nếu đã đến lúc"""
+        self.done += count
+        now = time.monotonic()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report()
+
+    def unit_finished(self) -> None:
+        """Ghi nhận một lượt (loại dữ liệu + mùa giải) đã xong"""
+        self.units_done += 1
+        self.report()
+
+    def eta(self) -> Optional[float]:
+        """Số giây ước tính để thu thập nốt các bản ghi đã biết (None nếu chưa đủ dữ liệu)"""
+        elapsed = time.monotonic() - self.started
+        if self.done == 0 or elapsed <= 0:
+            return None
+        return max(0, self.total - self.done) / (self.done / elapsed)
+
+    def report(self) -> None:
+        """In tiến độ chung"""
+        elapsed = time.monotonic() - self.started
+        percent = self.done / self.total * 100 if self.total else 0.0
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = self.eta()
+        logger.info(
+            f"Tiến độ: {self.units_done}/{self.units} lượt xong, {self.done}/{self.total} bản ghi ({percent:.1f}%), "
+            f"{rate:.1f} bản ghi/giây, đã chạy {format_duration(elapsed)}, "
+            f"còn lại khoảng {format_duration(eta) if eta is not None else '?'}"
+        )
+
+
+def format_duration(seconds: float) -> str:
+    """Định dạng số giây thành H:MM:SS"""
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
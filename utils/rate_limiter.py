@@ -0,0 +1,104 @@
+import asyncio
+import time
+import sys
+import os
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Optional
+
+# Thêm thư mục gốc vào path để import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST, RATE_LIMIT_MIN_PER_SECOND,
+    RATE_LIMIT_BACKOFF_FACTOR, RATE_LIMIT_RECOVERY_STEP
+)
+
+
+class TokenBucket:
+    """Bộ giới hạn tốc độ dạng token bucket, tự điều chỉnh theo phản hồi của API
+
+    - Token được nạp lại với tốc độ `rate` token/giây, tối đa `burst` token
+    - Mỗi request tiêu tốn 1 token, hết token thì chờ
+    - Gặp 429/503: giảm tốc độ theo cấp số nhân và tạm dừng theo Retry-After
+    - Mỗi request thành công: tăng dần tốc độ trở lại mức tối đa đã cấu hình
+    """
+
+    def __init__(self, rate: float = RATE_LIMIT_PER_SECOND, burst: int = RATE_LIMIT_BURST,
+                 min_rate: float = RATE_LIMIT_MIN_PER_SECOND,
+                 backoff_factor: float = RATE_LIMIT_BACKOFF_FACTOR,
+                 recovery_step: float = RATE_LIMIT_RECOVERY_STEP):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.capacity = max(1, burst)
+        self.backoff_factor = backoff_factor
+        self.recovery_step = recovery_step
+        self.tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        """Nạp thêm token theo thời gian đã trôi qua"""
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Chờ đến khi có token để gửi request"""
+        while True:
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def on_success(self) -> None:
+        """Tăng dần tốc độ sau mỗi request thành công"""
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        """Giảm tốc độ và tạm dừng khi API báo quá tải (429/503)"""
+        now = time.monotonic()
+        self._refill(now)
+        self.rate = max(self.min_rate, self.rate * self.backoff_factor)
+        self.tokens = 0.0
+
+        pause = retry_after if retry_after is not None else 1.0 / self.rate
+        self._paused_until = max(self._paused_until, now + pause)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Chuyển header Retry-After (số giây hoặc ngày giờ HTTP) thành số giây cần chờ"""
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+# Bộ giới hạn dùng chung cho toàn bộ tiến trình
+_shared_limiter: Optional[TokenBucket] = None
+
+
+def get_shared_limiter() -> TokenBucket:
+    """Lấy bộ giới hạn tốc độ dùng chung (tạo mới ở lần gọi đầu tiên)"""
+    global _shared_limiter
+    if _shared_limiter is None:
+        _shared_limiter = TokenBucket()
+    return _shared_limiter
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import random
+import time
+import sys
+import os
+from typing import Optional, Sequence
+
+import aiohttp
+
+# Thêm thư mục gốc vào path để import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    HTTP_REQUEST_TIMEOUT, HTTP_CONNECT_TIMEOUT, HTTP_MAX_RETRIES,
+    RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX, RETRY_STATUSES,
+    CIRCUIT_BREAKER_THRESHOLD, CIRCUIT_BREAKER_COOLDOWN, CIRCUIT_BREAKER_MAX_COOLDOWN
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RequestFailedError(Exception):
+    """Request vẫn lỗi tạm thời (timeout, mất kết nối, 429/5xx) sau khi đã thử lại hết số lần
+
+    Spider không được ghi bản ghi tương ứng vào checkpoint, để lần chạy --resume
+    sau thu thập lại thay vì mất dữ liệu.
+    """
+
+
+class RetryPolicy:
+    """Chính sách thử lại dùng chung cho mọi request của ApiClient
+
+    - Mỗi request có timeout (tổng thời gian và thời gian mở kết nối)
+    - Chỉ thử lại lỗi tạm thời: timeout, mất kết nối, phản hồi bị cắt, mã trạng thái
+      trong `retry_statuses`; các lỗi khác (404, JSON hỏng...) được ném ra ngay
+    - Thời gian chờ giữa các lần thử tăng theo cấp số nhân, có jitter ngẫu nhiên
+      để các tác vụ song song không gửi lại cùng lúc
+    """
+
+    def __init__(self, max_retries: int = HTTP_MAX_RETRIES, timeout: float = HTTP_REQUEST_TIMEOUT,
+                 connect_timeout: float = HTTP_CONNECT_TIMEOUT, backoff_base: float = RETRY_BACKOFF_BASE,
+                 backoff_max: float = RETRY_BACKOFF_MAX, retry_statuses: Sequence[int] = RETRY_STATUSES):
+        self.max_retries = max(0, max_retries)
+        self.timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=connect_timeout)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+
+    def is_retryable(self, error: BaseException) -> bool:
+        """Lỗi có phải lỗi tạm thời, nên gửi lại request không"""
+        if isinstance(error, aiohttp.ClientResponseError):
+            return error.status in self.retry_statuses
+        return isinstance(error, (asyncio.TimeoutError, aiohttp.ClientConnectionError, aiohttp.ClientPayloadError))
+
+    def backoff(self, attempt: int) -> float:
+        """Thời gian chờ trước lần thử lại thứ `attempt` (bắt đầu từ 1), dạng full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """Tạm dừng mọi request khi API liên tục lỗi, thay vì tiếp tục gửi và làm hỏng cả lần thu thập
+
+    - closed: request đi bình thường, đếm số lỗi tạm thời liên tiếp
+    - open: đủ `threshold` lỗi liên tiếp, mọi request chờ hết `cooldown` giây
+    - half_open: hết thời gian chờ, cho một request thử; thành công thì đóng lại,
+      lỗi thì mở lại với thời gian chờ gấp đôi (tối đa `max_cooldown`)
+    """
+
+    def __init__(self, threshold: int = CIRCUIT_BREAKER_THRESHOLD, cooldown: float = CIRCUIT_BREAKER_COOLDOWN,
+                 max_cooldown: float = CIRCUIT_BREAKER_MAX_COOLDOWN):
+        self.threshold = max(1, threshold)
+        self.base_cooldown = cooldown
+        self.max_cooldown = max(cooldown, max_cooldown)
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.failures = 0
+        self._opened_until = 0.0
+        self._probe_started = 0.0
+
+    async def acquire(self) -> None:
+        """Chờ đến khi được phép gửi request"""
+        while self.state != "closed":
+            now = time.monotonic()
+            if self.state == "open":
+                if now < self._opened_until:
+                    await asyncio.sleep(self._opened_until - now)
+                    continue
+                self.state = "half_open"
+                self._probe_started = now
+                logger.info("Hết thời gian tạm dừng, gửi thử một request tới API")
+                return
+
+            # half_open: chờ kết quả request thử (gửi thử lại nếu request đó bị treo/hủy)
+            if now - self._probe_started >= self.cooldown:
+                self._probe_started = now
+                return
+            await asyncio.sleep(min(1.0, self.cooldown))
+
+    def record_success(self) -> None:
+        """API phản hồi bình thường"""
+        if self.state != "closed":
+            logger.info("API hoạt động trở lại, tiếp tục thu thập")
+        self.state = "closed"
+        self.failures = 0
+        self.cooldown = self.base_cooldown
+
+    def record_failure(self) -> None:
+        """Một request gặp lỗi tạm thời"""
+        self.failures += 1
+        if self.state == "half_open":
+            self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+            self._open()
+        elif self.state == "closed" and self.failures >= self.threshold:
+            self._open()
+
+    def _open(self) -> None:
+        self.state = "open"
+        self._opened_until = time.monotonic() + self.cooldown
+        logger.warning(f"API lỗi {self.failures} lần liên tiếp, tạm dừng thu thập {self.cooldown:.0f} giây")
+
+
+# Circuit breaker dùng chung cho toàn bộ tiến trình
+_shared_breaker: Optional[CircuitBreaker] = None
+
+
+def get_shared_breaker() -> CircuitBreaker:
+    """Lấy circuit breaker dùng chung (tạo mới ở lần gọi đầu tiên)"""
+    global _shared_breaker
+    if _shared_breaker is None:
+        _shared_breaker = CircuitBreaker()
+    return _shared_breaker
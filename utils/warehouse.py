@@ -0,0 +1,340 @@
+import logging
+import os
+import sqlite3
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+# Thêm thư mục gốc vào path để import config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import WAREHOUSE_PATH
+from utils.json_stream import iter_json_records
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    match_id INTEGER PRIMARY KEY,
+    season TEXT,
+    kickoff_millis INTEGER,
+    match_date TEXT,
+    stadium TEXT,
+    city TEXT,
+    duration_secs INTEGER,
+    home_team_id INTEGER,
+    home_team_name TEXT,
+    home_score INTEGER,
+    away_team_id INTEGER,
+    away_team_name TEXT,
+    away_score INTEGER,
+    ht_home_score INTEGER,
+    ht_away_score INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_matches_season ON matches(season);
+
+CREATE TABLE IF NOT EXISTS match_team_stats (
+    match_id INTEGER NOT NULL,
+    season TEXT,
+    team_id INTEGER NOT NULL,
+    side TEXT,
+    stat_name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (match_id, team_id, stat_name)
+);
+CREATE INDEX IF NOT EXISTS idx_match_team_stats_season ON match_team_stats(season);
+
+CREATE TABLE IF NOT EXISTS lineups (
+    match_id INTEGER NOT NULL,
+    season TEXT,
+    team_id INTEGER NOT NULL,
+    side TEXT,
+    role TEXT NOT NULL,
+    slot INTEGER NOT NULL,
+    player_id INTEGER,
+    player_name TEXT,
+    position TEXT,
+    shirt_num INTEGER,
+    PRIMARY KEY (match_id, team_id, role, slot)
+);
+CREATE INDEX IF NOT EXISTS idx_lineups_player ON lineups(player_id);
+CREATE INDEX IF NOT EXISTS idx_lineups_season ON lineups(season);
+
+CREATE TABLE IF NOT EXISTS players (
+    player_id INTEGER NOT NULL,
+    season TEXT NOT NULL,
+    name TEXT,
+    first_name TEXT,
+    last_name TEXT,
+    position TEXT,
+    shirt_num INTEGER,
+    nationality TEXT,
+    nationality_code TEXT,
+    height REAL,
+    weight REAL,
+    date_of_birth INTEGER,
+    age TEXT,
+    image_url TEXT,
+    team_id INTEGER,
+    team_name TEXT,
+    team_short_name TEXT,
+    team_abbr TEXT,
+    team_slug TEXT,
+    PRIMARY KEY (player_id, season)
+);
+CREATE INDEX IF NOT EXISTS idx_players_season ON players(season);
+
+CREATE TABLE IF NOT EXISTS player_season_stats (
+    player_id INTEGER NOT NULL,
+    season TEXT NOT NULL,
+    stat_name TEXT NOT NULL,
+    value REAL,
+    rank INTEGER,
+    PRIMARY KEY (player_id, season, stat_name)
+);
+CREATE INDEX IF NOT EXISTS idx_player_season_stats_season ON player_season_stats(season, stat_name);
+
+CREATE TABLE IF NOT EXISTS player_match_details (
+    player_id INTEGER NOT NULL,
+    match_id INTEGER NOT NULL,
+    season TEXT,
+    player_name TEXT,
+    match_date INTEGER,
+    home_team TEXT,
+    away_team TEXT,
+    score TEXT,
+    mins_played INTEGER,
+    goals INTEGER,
+    assists INTEGER,
+    yellow_cards INTEGER,
+    red_cards INTEGER,
+    PRIMARY KEY (player_id, match_id)
+);
+CREATE INDEX IF NOT EXISTS idx_player_match_details_match ON player_match_details(match_id);
+CREATE INDEX IF NOT EXISTS idx_player_match_details_season ON player_match_details(season);
+"""
+
+# Các trường thông tin (không phải thống kê) của bản ghi cầu thủ
+PLAYER_COLUMNS = [
+    'player_id', 'season', 'name', 'first_name', 'last_name', 'position', 'shirt_num',
+    'nationality', 'nationality_code', 'height', 'weight', 'date_of_birth', 'age', 'image_url',
+    'team_id', 'team_name', 'team_short_name', 'team_abbr', 'team_slug'
+]
+
+MATCH_DETAIL_COLUMNS = [
+    'player_id', 'match_id', 'season', 'player_name', 'match_date', 'home_team', 'away_team',
+    'score', 'mins_played', 'goals', 'assists', 'yellow_cards', 'red_cards'
+]
+
+# Các trường của bản ghi cầu thủ không được coi là thống kê
+NON_STAT_FIELDS = set(PLAYER_COLUMNS) | {'team', 'match_details'}
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _insert_sql(table: str, columns: List[str]) -> str:
+    placeholders = ", ".join("?" for _ in columns)
+    return f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+
+def _lineup_rows(match_id, season, team_id, side, team_list: Dict) -> List[Tuple]:
+    """Các dòng đội hình (đá chính + dự bị) của một đội trong một trận đấu"""
+    rows = []
+    for role, key in (("starting", "lineup"), ("sub", "substitutes")):
+        for slot, player in enumerate(team_list.get(key) or [], 1):
+            if not isinstance(player, dict):
+                continue
+            info = player.get("info") or {}
+            rows.append((
+                match_id, season, team_id, side, role, slot,
+                player.get("id"),
+                (player.get("name") or {}).get("display"),
+                player.get("matchPosition") or info.get("position"),
+                player.get("matchShirtNumber") or info.get("shirtNum"),
+            ))
+    return rows
+
+
+class Warehouse:
+    """Kho dữ liệu SQLite cục bộ cho trận đấu và cầu thủ
+
+    Dữ liệu spider được chuẩn hóa thành các bảng có chỉ mục theo match_id,
+    player_id và season, nên có thể truy vấn trực tiếp bằng SQL thay vì đọc lại
+    toàn bộ file CSV. Nạp lại cùng một trận đấu/cầu thủ sẽ thay thế bản ghi cũ.
+    """
+
+    def __init__(self, path: str = WAREHOUSE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self) -> "Warehouse":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def load_matches(self, matches: Iterable[Dict]) -> int:
+        """Nạp các trận đấu (kết quả của MatchSpider.extract_match_data)
+
+        Returns:
+            int: Số trận đấu đã nạp
+        """
+        count = 0
+        with self.conn:
+            for match in matches:
+                if not match or not match.get("id"):
+                    continue
+                self._load_match(match)
+                count += 1
+        return count
+
+    def _load_match(self, match: Dict) -> None:
+        match_id = match.get("id")
+        season = match.get("season")
+        teams = match.get("teams") or []
+        home = teams[0] if len(teams) > 0 and isinstance(teams[0], dict) else {}
+        away = teams[1] if len(teams) > 1 and isinstance(teams[1], dict) else {}
+        home_team = home.get("team") or {}
+        away_team = away.get("team") or {}
+        kick_off = match.get("kick_off") or {}
+        ground = match.get("ground") or {}
+        half_time = match.get("halfTimeScore") or {}
+
+        self.conn.execute(_insert_sql("matches", [
+            "match_id", "season", "kickoff_millis", "match_date", "stadium", "city", "duration_secs",
+            "home_team_id", "home_team_name", "home_score",
+            "away_team_id", "away_team_name", "away_score", "ht_home_score", "ht_away_score"
+        ]), (
+            match_id, season, kick_off.get("millis"), kick_off.get("label"),
+            ground.get("name"), ground.get("city"), (match.get("clock") or {}).get("secs"),
+            home_team.get("id"), home_team.get("name"), home.get("score"),
+            away_team.get("id"), away_team.get("name"), away.get("score"),
+            half_time.get("homeScore"), half_time.get("awayScore"),
+        ))
+
+        # Xóa dữ liệu con cũ của trận đấu trước khi nạp lại
+        for table in ("match_team_stats", "lineups"):
+            self.conn.execute(f"DELETE FROM {table} WHERE match_id = ?", (match_id,))
+
+        sides = {home_team.get("id"): "home", away_team.get("id"): "away"}
+
+        stats = match.get("stats") or {}
+        stat_rows = []
+        for team_id, side in sides.items():
+            if team_id is None:
+                continue
+            for stat in (stats.get(str(team_id)) or {}).get("M", []) or []:
+                if isinstance(stat, dict) and "name" in stat:
+                    stat_rows.append((match_id, season, team_id, side, stat["name"], stat.get("value")))
+        self.conn.executemany(_insert_sql("match_team_stats", [
+            "match_id", "season", "team_id", "side", "stat_name", "value"
+        ]), stat_rows)
+
+        lineup_rows = []
+        for team_list in match.get("teamLists") or []:
+            if not isinstance(team_list, dict):
+                continue
+            team_id = team_list.get("teamId")
+            lineup_rows.extend(_lineup_rows(match_id, season, team_id, sides.get(team_id), team_list))
+        self.conn.executemany(_insert_sql("lineups", [
+            "match_id", "season", "team_id", "side", "role", "slot",
+            "player_id", "player_name", "position", "shirt_num"
+        ]), lineup_rows)
+
+    def load_players(self, players: Iterable[Dict]) -> int:
+        """Nạp các cầu thủ (kết quả của extract_player_data, kể cả match_details)
+
+        Returns:
+            int: Số cầu thủ đã nạp
+        """
+        count = 0
+        with self.conn:
+            for player in players:
+                if not player or not player.get("player_id") or not player.get("season"):
+                    continue
+                self._load_player(player)
+                count += 1
+        return count
+
+    def _load_player(self, player: Dict) -> None:
+        player_id = player["player_id"]
+        season = player["season"]
+
+        row = {column: player.get(column) for column in PLAYER_COLUMNS}
+        # PlayerSpider lưu tên đội ở trường "team"
+        row["team_name"] = row["team_name"] or player.get("team")
+        self.conn.execute(_insert_sql("players", PLAYER_COLUMNS), [row[c] for c in PLAYER_COLUMNS])
+
+        # Thống kê dạng dài (player_id, season, stat_name, value, rank); thống kê chi tiết
+        # "stat_*" được ưu tiên hơn thống kê cơ bản cùng tên (giống khi chuyển sang CSV)
+        values, ranks = {}, {}
+        for key, value in player.items():
+            if key in NON_STAT_FIELDS or not _is_number(value):
+                continue
+            if key.startswith("rank_"):
+                ranks[key[5:]] = value
+            elif not key.startswith("stat_"):
+                values[key] = value
+        for key, value in player.items():
+            if key.startswith("stat_") and _is_number(value):
+                values[key[5:]] = value
+
+        self.conn.execute("DELETE FROM player_season_stats WHERE player_id = ? AND season = ?",
+                          (player_id, season))
+        self.conn.executemany(_insert_sql("player_season_stats", [
+            "player_id", "season", "stat_name", "value", "rank"
+        ]), [(player_id, season, name, value, ranks.get(name)) for name, value in values.items()])
+
+        details = player.get("match_details")
+        if details:
+            self.conn.execute("DELETE FROM player_match_details WHERE player_id = ? AND season = ?",
+                              (player_id, season))
+            detail_rows = []
+            for detail in details:
+                if not isinstance(detail, dict) or detail.get("match_id") is None:
+                    continue
+                detail = dict(detail, player_id=player_id, season=season, player_name=player.get("name"))
+                detail_rows.append([detail.get(c) for c in MATCH_DETAIL_COLUMNS])
+            self.conn.executemany(_insert_sql("player_match_details", MATCH_DETAIL_COLUMNS), detail_rows)
+
+    def load_file(self, path: str) -> Tuple[int, int]:
+        """Nạp một file JSON/JSONL do spider tạo ra (tự nhận biết trận đấu hay cầu thủ)
+
+        Returns:
+            Tuple[int, int]: (số trận đấu, số cầu thủ) đã nạp
+        """
+        matches, players = [], []
+        match_count = player_count = 0
+        for record in iter_json_records(path):
+            if not isinstance(record, dict):
+                continue
+            if record.get("type") == "match" or ("teams" in record and "id" in record):
+                matches.append(record)
+            elif "player_id" in record:
+                players.append(record)
+            # Nạp theo lô để bộ nhớ không tăng theo kích thước file
+            if len(matches) >= 500:
+                match_count += self.load_matches(matches)
+                matches = []
+            if len(players) >= 500:
+                player_count += self.load_players(players)
+                players = []
+        match_count += self.load_matches(matches)
+        player_count += self.load_players(players)
+        logger.info(f"Đã nạp {match_count} trận đấu, {player_count} cầu thủ từ {path}")
+        return match_count, player_count
+
+    def query(self, sql: str, params: Optional[Tuple] = None):
+        """Chạy truy vấn SQL và trả về DataFrame"""
+        return pd.read_sql_query(sql, self.conn, params=params)